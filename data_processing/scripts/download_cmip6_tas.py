@@ -18,9 +18,13 @@ Setup:
     key: 3c0feaf1-f3eb-477e-a577-63445b16b883
 """
 import logging
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cdsapi
+import urllib3
 
 # Setup logging
 logging.basicConfig(
@@ -42,6 +46,136 @@ COMMON_PARAMS = {
     "area": [72, -170, 18, -50],  # [North, West, South, East] - Continental US
 }
 
+# Shared HTTP connection pool: all downloads come from the same CDS host, so
+# keep-alive connections are reused instead of a new TCP+TLS handshake per file
+POOL = urllib3.PoolManager(
+    maxsize=4,
+    retries=urllib3.Retry(total=3, backoff_factor=0.5),
+)
+
+# Attempts made to finish an interrupted transfer before giving up
+DOWNLOAD_ATTEMPTS = 5
+
+
+def fetch_resumable(url, part_file):
+    """
+    Download url into part_file, resuming any earlier partial transfer.
+    
+    The expected size comes from a HEAD request. Interrupted transfers are
+    continued with a Range request and appended to part_file, both within a
+    run and across runs (as long as CDS hands back the same result URL, which
+    is recorded next to the partial file).
+    
+    Args:
+        url: Download URL of the CDS result
+        part_file: Path of the partial download
+    """
+    url_file = part_file.with_name(part_file.name + ".url")
+    if part_file.exists() and (not url_file.exists() or url_file.read_text() != url):
+        # Partial data belongs to a different result; start over
+        part_file.unlink()
+    url_file.write_text(url)
+    
+    head = POOL.request("HEAD", url, timeout=60)
+    total = int(head.headers.get("Content-Length", 0)) or None
+    
+    # Without a known size only a transfer that ran to the end proves the
+    # download complete
+    finished = False
+    for attempt in range(1, DOWNLOAD_ATTEMPTS + 1):
+        done = part_file.stat().st_size if part_file.exists() else 0
+        if total is not None and done >= total:
+            break
+        if done:
+            logger.info(f"  Resuming {part_file.name} at {done / 1024 / 1024:.1f} MB")
+        
+        headers = {"Range": f"bytes={done}-"} if done else {}
+        response = POOL.request("GET", url, headers=headers, preload_content=False, timeout=300)
+        try:
+            if response.status >= 400:
+                raise IOError(f"HTTP {response.status} while downloading {url}")
+            # A plain 200 means the server ignored the range; rewrite from the start
+            mode = 'ab' if response.status == 206 else 'wb'
+            with open(part_file, mode) as out_file:
+                shutil.copyfileobj(response, out_file)
+        except (urllib3.exceptions.HTTPError, ConnectionError) as e:
+            logger.warning(f"  Transfer interrupted (attempt {attempt}/{DOWNLOAD_ATTEMPTS}): {e}")
+            continue
+        finally:
+            response.release_conn()
+        
+        finished = True
+        if total is None:
+            break
+    
+    size = part_file.stat().st_size if part_file.exists() else 0
+    if total is None and not finished:
+        raise IOError(f"Download of {url} failed after {DOWNLOAD_ATTEMPTS} attempts ({size} bytes received)")
+    if total is not None and size != total:
+        raise IOError(f"Incomplete download of {url}: {size} of {total} bytes")
+    url_file.unlink()
+
+
+def extract_netcdf(fileobj, output_file):
+    """
+    Write the NetCDF payload of a CDS download to output_file.
+    
+    CDS usually returns a ZIP archive. A single .nc member is written to
+    output_file; if the archive holds several, they are extracted next to it
+    under their archive names and listed in a manifest (see manifest_path).
+    Non-ZIP payloads are copied through as-is.
+    output_file is written under a temporary name and renamed when complete,
+    so an existing output_file is never a truncated one.
+    
+    Args:
+        fileobj: Seekable binary file positioned at the start of the download
+        output_file: Path to save NetCDF file
+    """
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    if not zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with open(tmp_file, 'wb') as out_file:
+            shutil.copyfileobj(fileobj, out_file)
+        tmp_file.replace(output_file)
+        return
+    
+    logger.info(f"Extracting NetCDF files for {output_file.name}...")
+    with zipfile.ZipFile(fileobj, 'r') as zip_ref:
+        # Extract only .nc files
+        nc_files = [f for f in zip_ref.namelist() if f.endswith('.nc')]
+        if len(nc_files) == 1:
+            with zip_ref.open(nc_files[0]) as src, open(tmp_file, 'wb') as out_file:
+                shutil.copyfileobj(src, out_file)
+            tmp_file.replace(output_file)
+            logger.info(f"  ✓ Extracted {nc_files[0]} -> {output_file.name}")
+            return
+        for nc_file in nc_files:
+            zip_ref.extract(nc_file, output_file.parent)
+            logger.info(f"  ✓ Extracted {nc_file}")
+        # Written last, so it only exists once every member is on disk
+        manifest_path(output_file).write_text("\n".join(nc_files) + "\n")
+
+
+def manifest_path(output_file):
+    """Path of the list of NetCDF files extracted in place of output_file."""
+    return output_file.with_name(output_file.name + ".members")
+
+
+def is_downloaded(output_file):
+    """
+    Check whether a dataset is already on disk.
+    
+    True if output_file exists, or if the archive was extracted into several
+    files and all of those listed in its manifest exist.
+    """
+    if output_file.exists():
+        return True
+    manifest = manifest_path(output_file)
+    if not manifest.exists():
+        return False
+    members = manifest.read_text().split()
+    return bool(members) and all((output_file.parent / member).exists() for member in members)
+
 
 def download_experiment(client, experiment, years, output_file):
     """
@@ -64,31 +198,19 @@ def download_experiment(client, experiment, years, output_file):
     try:
         result = client.retrieve("projections-cmip6", request)
         
-        # Use direct download with shorter timeout
-        import urllib.request
-        import shutil
-        import zipfile
-        
         # Get the download URL
         download_url = result.location
         logger.info(f"Downloading from: {download_url}")
         
-        # Download with urllib (more reliable for large files)
-        with urllib.request.urlopen(download_url, timeout=300) as response:
-            with open(output_file, 'wb') as out_file:
-                shutil.copyfileobj(response, out_file)
-        
-        logger.info(f"✓ Downloaded {output_file.name} ({output_file.stat().st_size / 1024 / 1024:.1f} MB)")
+        # Download into a resumable partial file; it is removed once the
+        # NetCDF inside has been extracted
+        part_file = output_file.with_name(output_file.name + ".part")
+        fetch_resumable(download_url, part_file)
+        logger.info(f"✓ Downloaded {experiment} ({part_file.stat().st_size / 1024 / 1024:.1f} MB)")
         
-        # Extract ZIP archive (CDS returns ZIP files)
-        if zipfile.is_zipfile(output_file):
-            logger.info(f"Extracting NetCDF files from {output_file.name}...")
-            with zipfile.ZipFile(output_file, 'r') as zip_ref:
-                # Extract only .nc files
-                nc_files = [f for f in zip_ref.namelist() if f.endswith('.nc')]
-                for nc_file in nc_files:
-                    zip_ref.extract(nc_file, output_file.parent)
-                    logger.info(f"  ✓ Extracted {nc_file}")
+        with open(part_file, 'rb') as archive:
+            extract_netcdf(archive, output_file)
+        part_file.unlink()
         
     except Exception as e:
         logger.error(f"✗ Failed to download {experiment}: {e}")
@@ -122,21 +244,31 @@ def main():
         },
     ]
     
-    # Download each dataset
+    # Skip datasets that already exist
+    pending = []
     for dataset in datasets:
-        output_file = OUTPUT_DIR / dataset["filename"]
-        
-        # Skip if already exists
-        if output_file.exists():
+        if is_downloaded(OUTPUT_DIR / dataset["filename"]):
             logger.info(f"⊙ Skipping {dataset['filename']} (already exists)")
-            continue
-        
-        download_experiment(
-            client=client,
-            experiment=dataset["experiment"],
-            years=dataset["years"],
-            output_file=output_file,
-        )
+        else:
+            pending.append(dataset)
+    
+    # Download the remaining datasets concurrently; CDS queueing and transfer
+    # time dominate, and the jobs are independent
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [
+                executor.submit(
+                    download_experiment,
+                    client=client,
+                    experiment=dataset["experiment"],
+                    years=dataset["years"],
+                    output_file=OUTPUT_DIR / dataset["filename"],
+                )
+                for dataset in pending
+            ]
+            # Re-raise the first download failure, if any
+            for future in futures:
+                future.result()
     
     logger.info("\n" + "="*60)
     logger.info("Download complete!")
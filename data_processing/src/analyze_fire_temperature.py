@@ -13,47 +13,152 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Optional
 
+import matplotlib
+
+matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
+import numba
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
 import seaborn as sns
+from matplotlib import cbook
+from matplotlib.colors import LogNorm
 
 # Set style
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
+plt.rcParams['path.simplify_threshold'] = 1.0
 
+# Streaming CSV reader settings (64 MB blocks keep peak memory bounded)
+CSV_BLOCK_SIZE = 64 << 20
 
-def load_and_clean_data(csv_path: str) -> pd.DataFrame:
-    """Load fire-temperature data and perform basic cleaning."""
-    print(f"Loading data from {csv_path}...")
-    df = pd.read_csv(csv_path, parse_dates=['discovery_date', 'cont_date'])
-    
-    print(f"  Loaded {len(df):,} records")
-    
-    # Filter to records with valid temperature data
-    df_clean = df[df['discovery_temp'].notna()].copy()
-    print(f"  {len(df_clean):,} records have temperature data ({len(df_clean)/len(df)*100:.1f}%)")
+# Columns the analysis reads; everything else in the merged CSV is skipped by
+# the reader instead of being parsed and thrown away
+NEEDED_COLUMNS = [
+    'OBJECTID', 'discovery_date', 'cont_date', 'discovery_temp', 'mean_temp', 'temp_range',
+    'FIRE_SIZE', 'FIRE_SIZE_CLASS', 'STAT_CAUSE_DESCR', 'STATE', 'LATITUDE', 'LONGITUDE',
+]
+
+# Column types declared up front so Arrow skips type inference; measurements
+# are kept in float32 since the analysis never needs double precision.
+# Dictionary-encoded string columns arrive in pandas as Categoricals, so the
+# group-by / value_counts / crosstab keys work on integer codes.
+CATEGORICAL_COLUMNS = ['STATE', 'STAT_CAUSE_DESCR', 'FIRE_SIZE_CLASS']
+CSV_COLUMN_TYPES = {
+    'discovery_date': pa.timestamp('ns'),
+    'cont_date': pa.timestamp('ns'),
+    'FIRE_SIZE': pa.float32(),
+    'LATITUDE': pa.float32(),
+    'LONGITUDE': pa.float32(),
+    'discovery_temp': pa.float32(),
+    'mean_temp': pa.float32(),
+    'temp_range': pa.float32(),
+    **{column: pa.dictionary(pa.int32(), pa.string()) for column in CATEGORICAL_COLUMNS},
+}
+
+# Geographic map raster: [[lon_min, lon_max], [lat_min, lat_max]] and cell counts
+MAP_EXTENT = [[-130, -65], [25, 50]]
+MAP_GRID_BINS = (520, 300)
+
+# Latitude x temperature density raster
+LAT_TEMP_GRID_BINS = (240, 160)
+
+# Figures use constrained layout, so they are rasterized once at their own
+# size; PNGs are written with fast zlib compression
+PNG_SAVE_OPTIONS = {'compress_level': 1, 'optimize': False}
+
+# Seasons in plotting order, and the season code for each month (Jan..Dec)
+SEASON_ORDER = ['Winter', 'Spring', 'Summer', 'Fall']
+SEASON_CODE_BY_MONTH = np.array([0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 0], dtype=np.int8)
+
+
+def cleaned_cache_path(csv_path: str) -> Path:
+    """Parquet cache of the cleaned frame, stored next to the source CSV."""
+    return Path(csv_path).with_suffix('.cleaned.parquet')
+
+
+def load_and_clean_data(csv_path: str, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Load fire-temperature data and perform basic cleaning.
+    
+    The cleaned frame is cached as Parquet next to the CSV and reused while it
+    is newer than the CSV, so repeat runs skip CSV parsing and derived columns.
+    """
+    cache_path = cleaned_cache_path(csv_path)
+    if (use_cache and cache_path.exists()
+            and cache_path.stat().st_mtime >= Path(csv_path).stat().st_mtime):
+        print(f"Loading cleaned data from {cache_path}...")
+        df_clean = pd.read_parquet(cache_path, engine='pyarrow')
+        print(f"  Loaded {len(df_clean):,} records with temperature data")
+        return df_clean
     
-    # Add derived columns
-    df_clean['discovery_year'] = df_clean['discovery_date'].dt.year
-    df_clean['discovery_month'] = df_clean['discovery_date'].dt.month
-    df_clean['discovery_day_of_year'] = df_clean['discovery_date'].dt.dayofyear
+    print(f"Loading data from {csv_path}...")
+    reader = pv.open_csv(
+        csv_path,
+        read_options=pv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pv.ConvertOptions(
+            column_types=CSV_COLUMN_TYPES,
+            include_columns=NEEDED_COLUMNS,
+            timestamp_parsers=[pv.ISO8601],
+        ),
+    )
     
-    # Calculate fire duration in days
-    df_clean['duration_days'] = (
-        df_clean['cont_date'] - df_clean['discovery_date']
-    ).dt.total_seconds() / 86400
-    df_clean['duration_days'] = df_clean['duration_days'].clip(lower=0)
+    # Stream record batches and drop rows without temperature data on the fly,
+    # so they never get materialized as pandas objects
+    total_rows = 0
+    batches = []
+    for batch in reader:
+        total_rows += batch.num_rows
+        batches.append(batch.filter(batch.column('discovery_temp').is_valid()))
+    
+    table = pa.Table.from_batches(batches, schema=reader.schema)
+    del batches
+    df_clean = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    
+    # Arrow dictionaries list values in order of first appearance; sort them so
+    # categorical axes (e.g. size classes A-G) come out alphabetical
+    for column in CATEGORICAL_COLUMNS:
+        categories = df_clean[column].cat.categories
+        df_clean[column] = df_clean[column].cat.reorder_categories(categories.sort_values())
+    
+    print(f"  Loaded {total_rows:,} records")
+    print(f"  {len(df_clean):,} records have temperature data ({len(df_clean)/total_rows*100:.1f}%)")
+    
+    # Add derived columns straight from the datetime64 buffer (one pass per column)
+    disc = df_clean['discovery_date'].to_numpy(dtype='datetime64[ns]')
+    disc_years = disc.astype('datetime64[Y]')
+    disc_months = disc.astype('datetime64[M]')
+    df_clean['discovery_year'] = disc_years.astype(np.int64) + 1970
+    df_clean['discovery_month'] = disc_months.astype(np.int64) % 12 + 1
+    df_clean['discovery_day_of_year'] = (
+        disc.astype('datetime64[D]') - disc_years
+    ).astype(np.int64) + 1
+    
+    # Calculate fire duration in days (NaT containment dates propagate as NaN)
+    cont = df_clean['cont_date'].to_numpy(dtype='datetime64[ns]')
+    duration = ((cont - disc) / np.timedelta64(1, 'D')).astype(np.float32)
+    np.clip(duration, 0, None, out=duration)
+    df_clean['duration_days'] = duration
+    
+    # Season mapping (month -> SEASON_ORDER code lookup, stored as a Categorical)
+    df_clean['season'] = pd.Categorical.from_codes(
+        SEASON_CODE_BY_MONTH[df_clean['discovery_month'].to_numpy() - 1],
+        categories=SEASON_ORDER,
+    )
     
-    # Season mapping
-    season_map = {1: 'Winter', 2: 'Winter', 3: 'Spring', 4: 'Spring', 5: 'Spring',
-                  6: 'Summer', 7: 'Summer', 8: 'Summer', 9: 'Fall', 10: 'Fall',
-                  11: 'Fall', 12: 'Winter'}
-    df_clean['season'] = df_clean['discovery_month'].map(season_map)
+    if use_cache:
+        df_clean.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+        print(f"  Cached cleaned data to {cache_path}")
     
     return df_clean
 
@@ -65,34 +170,133 @@ def create_output_dir(output_dir: str) -> Path:
     return path
 
 
-def plot_temporal_trends(df: pd.DataFrame, output_dir: Path):
-    """Generate temporal analysis plots."""
-    print("\nGenerating temporal analysis plots...")
-    
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+@numba.njit(cache=True, parallel=True)
+def _grouped_sums(codes, values, n_groups):
+    """
+    Per-group row counts, non-NaN counts and sums of each column of values.
+    
+    Rows are split into one contiguous chunk per thread, each accumulating
+    into its own slice of the partial arrays, so no two threads ever write the
+    same slot; the partials are summed at the end. Negative codes (missing
+    category) are skipped.
+    """
+    n_rows, n_values = values.shape
+    n_chunks = numba.get_num_threads()
+    chunk_size = (n_rows + n_chunks - 1) // n_chunks
+    rows = np.zeros((n_chunks, n_groups), dtype=np.int64)
+    valid = np.zeros((n_chunks, n_groups, n_values), dtype=np.int64)
+    sums = np.zeros((n_chunks, n_groups, n_values), dtype=np.float64)
+    for chunk in numba.prange(n_chunks):
+        for i in range(chunk * chunk_size, min(n_rows, (chunk + 1) * chunk_size)):
+            group = codes[i]
+            if group < 0:
+                continue
+            rows[chunk, group] += 1
+            for j in range(n_values):
+                value = values[i, j]
+                if not np.isnan(value):
+                    valid[chunk, group, j] += 1
+                    sums[chunk, group, j] += value
+    return rows.sum(axis=0), valid.sum(axis=0), sums.sum(axis=0)
+
+
+def compute_group_aggregates(df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Compute fire count, mean temperature and mean size per grouping key.
+    
+    Each key column is reduced once here and the result is shared by all plots
+    and the statistics summary. Categorical keys (season, state, cause) are
+    reduced over their integer codes with a parallel numba kernel; the integer
+    calendar keys go through a single pandas groupby. Count-ranked keys (state,
+    cause) are sorted by descending count; calendar keys (year, month, season)
+    by their own order.
+    """
+    keys = {
+        'year': 'discovery_year',
+        'month': 'discovery_month',
+        'season': 'season',
+        'state': 'STATE',
+        'cause': 'STAT_CAUSE_DESCR',
+    }
+    values = np.column_stack([
+        df['discovery_temp'].to_numpy(dtype=np.float32),
+        df['FIRE_SIZE'].to_numpy(dtype=np.float32),
+    ])
+    aggs = {}
+    for name, column in keys.items():
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            categories = df[column].cat.categories
+            rows, valid, sums = _grouped_sums(
+                df[column].cat.codes.to_numpy(dtype=np.int32), values, len(categories)
+            )
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = sums / valid
+            observed = rows > 0
+            agg = pd.DataFrame(
+                {
+                    'count': rows[observed],
+                    'mean_temp': means[observed, 0],
+                    'mean_size': means[observed, 1],
+                },
+                index=pd.CategoricalIndex(categories[observed], categories=categories, name=column),
+            )
+        else:
+            agg = df.groupby(column, observed=True, sort=False).agg(
+                count=('OBJECTID', 'size'),
+                mean_temp=('discovery_temp', 'mean'),
+                mean_size=('FIRE_SIZE', 'mean'),
+            )
+        if name in ('state', 'cause'):
+            agg = agg.sort_values('count', ascending=False, kind='stable')
+        else:
+            agg = agg.sort_index()
+        aggs[name] = agg
+    return aggs
+
+
+def compute_temporal_trends(df: pd.DataFrame, aggs: dict[str, pd.DataFrame]) -> dict:
+    """Precompute the arrays drawn by draw_temporal_trends."""
+    yearly = aggs['year']
+    
+    # Count fires per day once, then histogram the 366 day totals into 52 bins
+    day_of_year = df['discovery_day_of_year'].to_numpy()
+    day_counts = np.bincount(day_of_year, minlength=367)
+    day_edges = np.linspace(day_of_year.min(), day_of_year.max(), 53)
+    day_hist, _ = np.histogram(np.arange(day_counts.size), bins=day_edges, weights=day_counts)
+    
+    return {
+        'years': yearly.index.to_numpy(),
+        'yearly_counts': yearly['count'].to_numpy(),
+        'yearly_temp': yearly['mean_temp'].to_numpy(),
+        'monthly_counts': aggs['month']['count'].reindex(range(1, 13), fill_value=0).to_numpy(),
+        'day_edges': day_edges,
+        'day_hist': day_hist,
+    }
+
+
+def draw_temporal_trends(data: dict, output_dir: Path):
+    """Draw the temporal analysis figure from precomputed arrays."""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), layout='constrained')
     
     # 1. Fires per year
-    yearly = df.groupby('discovery_year').size()
-    axes[0, 0].plot(yearly.index, yearly.values, marker='o', linewidth=2)
+    axes[0, 0].plot(data['years'], data['yearly_counts'], marker='o', linewidth=2)
     axes[0, 0].set_xlabel('Year', fontsize=12)
     axes[0, 0].set_ylabel('Number of Fires', fontsize=12)
     axes[0, 0].set_title('Wildfire Frequency Over Time (1992-2013)', fontsize=14, fontweight='bold')
     axes[0, 0].grid(True, alpha=0.3)
     
     # 2. Mean temperature over years
-    yearly_temp = df.groupby('discovery_year')['discovery_temp'].mean()
     ax2 = axes[0, 1]
-    ax2.plot(yearly_temp.index, yearly_temp.values, marker='o', color='orangered', linewidth=2)
+    ax2.plot(data['years'], data['yearly_temp'], marker='o', color='orangered', linewidth=2)
     ax2.set_xlabel('Year', fontsize=12)
     ax2.set_ylabel('Mean Temperature (°C)', fontsize=12)
     ax2.set_title('Average Discovery Temperature Over Time', fontsize=14, fontweight='bold')
     ax2.grid(True, alpha=0.3)
     
     # 3. Monthly distribution (all years combined)
-    monthly_counts = df.groupby('discovery_month').size()
     month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-    axes[1, 0].bar(range(1, 13), monthly_counts.values, color='steelblue')
+    axes[1, 0].bar(range(1, 13), data['monthly_counts'], color='steelblue')
     axes[1, 0].set_xlabel('Month', fontsize=12)
     axes[1, 0].set_ylabel('Total Fires', fontsize=12)
     axes[1, 0].set_title('Seasonal Distribution of Wildfires', fontsize=14, fontweight='bold')
@@ -101,57 +305,115 @@ def plot_temporal_trends(df: pd.DataFrame, output_dir: Path):
     axes[1, 0].grid(True, axis='y', alpha=0.3)
     
     # 4. Day of year density
-    axes[1, 1].hist(df['discovery_day_of_year'], bins=52, color='forestgreen', alpha=0.7, edgecolor='black')
+    day_edges = data['day_edges']
+    axes[1, 1].bar(day_edges[:-1], data['day_hist'], width=np.diff(day_edges), align='edge',
+                   color='forestgreen', alpha=0.7, edgecolor='black')
     axes[1, 1].set_xlabel('Day of Year', fontsize=12)
     axes[1, 1].set_ylabel('Number of Fires', fontsize=12)
     axes[1, 1].set_title('Fire Distribution Throughout the Year', fontsize=14, fontweight='bold')
     axes[1, 1].grid(True, axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_dir / 'temporal_trends.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_dir / 'temporal_trends.png', dpi=300, pil_kwargs=PNG_SAVE_OPTIONS)
+    plt.close(fig)
     print("  ✓ Saved temporal_trends.png")
 
 
-def plot_temperature_relationships(df: pd.DataFrame, output_dir: Path):
-    """Plot relationships between temperature and fire characteristics."""
-    print("\nGenerating temperature relationship plots...")
+def plot_temporal_trends(df: pd.DataFrame, aggs: dict[str, pd.DataFrame], output_dir: Path):
+    """Generate temporal analysis plots."""
+    print("\nGenerating temporal analysis plots...")
+    draw_temporal_trends(compute_temporal_trends(df, aggs), output_dir)
+
+
+def compute_temperature_relationships(df: pd.DataFrame) -> dict:
+    """Precompute the arrays drawn by draw_temperature_relationships."""
+    temps = df['discovery_temp'].to_numpy(dtype=np.float32)
+    
+    # Box statistics per season, so only the summary (and fliers) reach the figure
+    season_codes = df['season'].cat.codes.to_numpy()
+    season_box_stats = cbook.boxplot_stats(
+        [temps[season_codes == code] for code in range(len(SEASON_ORDER))],
+        labels=SEASON_ORDER,
+    )
     
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    # Equal-width bins as integer codes (right-closed like pd.cut), averaged with bincount
+    edges = np.linspace(temps.min(), temps.max(), 11)
+    temp_bins = np.searchsorted(edges[1:-1], temps, side='left')
+    bin_counts = np.bincount(temp_bins, minlength=10)
+    bin_sizes = np.bincount(temp_bins, weights=df['FIRE_SIZE'].to_numpy(dtype=np.float32), minlength=10)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        size_by_temp = bin_sizes / bin_counts
+    bin_centers = (edges[:-1] + edges[1:]) / 2
+    
+    # Temperature range vs duration for fires with a positive duration; only
+    # the two needed columns are compacted, not a copy of the whole frame
+    duration_days = df['duration_days'].to_numpy()
+    has_duration = duration_days > 0
+    duration_days = duration_days[has_duration]
+    duration_temp_range = df['temp_range'].to_numpy()[has_duration]
+    duration_q95 = np.quantile(duration_days, 0.95) if duration_days.size else np.nan
+    
+    # Fire size class distribution by temperature quartile
+    # (quartile x size class counts from one bincount over the integer codes,
+    # then row-normalized to percentages)
+    quartile_labels = ['Q1 (Cold)', 'Q2', 'Q3', 'Q4 (Hot)']
+    quartiles = np.searchsorted(np.quantile(temps, [0.25, 0.5, 0.75]), temps, side='left')
+    size_classes = df['FIRE_SIZE_CLASS'].cat
+    class_codes = size_classes.codes.to_numpy()
+    has_class = class_codes >= 0
+    n_classes = len(size_classes.categories)
+    class_counts = np.bincount(quartiles[has_class] * n_classes + class_codes[has_class],
+                               minlength=len(quartile_labels) * n_classes)
+    class_counts = class_counts.reshape(len(quartile_labels), n_classes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        class_pct = class_counts / class_counts.sum(axis=1, keepdims=True) * 100
+    size_class_temp = pd.DataFrame(class_pct,
+                                   index=pd.Index(quartile_labels, name='temp_quartile'),
+                                   columns=pd.Index(size_classes.categories, name='FIRE_SIZE_CLASS'))
+    
+    return {
+        'season_box_stats': season_box_stats,
+        'bin_centers': bin_centers,
+        'size_by_temp': size_by_temp,
+        'duration_temp_range': duration_temp_range,
+        'duration_days': duration_days,
+        'duration_q95': duration_q95,
+        'size_class_temp': size_class_temp,
+    }
+
+
+def draw_temperature_relationships(data: dict, output_dir: Path):
+    """Draw the temperature relationship figure from precomputed arrays."""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), layout='constrained')
     
     # 1. Temperature distribution by season
-    season_order = ['Winter', 'Spring', 'Summer', 'Fall']
-    sns.boxplot(data=df, x='season', y='discovery_temp', order=season_order, ax=axes[0, 0])
+    boxes = axes[0, 0].bxp(data['season_box_stats'], patch_artist=True, widths=0.6)
+    for patch, color in zip(boxes['boxes'], sns.color_palette(n_colors=len(SEASON_ORDER))):
+        patch.set_facecolor(color)
     axes[0, 0].set_xlabel('Season', fontsize=12)
     axes[0, 0].set_ylabel('Temperature (°C)', fontsize=12)
     axes[0, 0].set_title('Temperature Distribution by Season', fontsize=14, fontweight='bold')
     axes[0, 0].grid(True, axis='y', alpha=0.3)
     
     # 2. Fire size vs temperature (binned)
-    temp_bins = pd.cut(df['discovery_temp'], bins=10)
-    size_by_temp = df.groupby(temp_bins)['FIRE_SIZE'].mean()
-    bin_centers = [interval.mid for interval in size_by_temp.index]
-    axes[0, 1].plot(bin_centers, size_by_temp.values, marker='o', linewidth=2, markersize=8, color='red')
+    axes[0, 1].plot(data['bin_centers'], data['size_by_temp'], marker='o', linewidth=2, markersize=8, color='red')
     axes[0, 1].set_xlabel('Temperature (°C)', fontsize=12)
     axes[0, 1].set_ylabel('Average Fire Size (acres)', fontsize=12)
     axes[0, 1].set_title('Fire Size vs. Discovery Temperature', fontsize=14, fontweight='bold')
     axes[0, 1].grid(True, alpha=0.3)
     
     # 3. Temperature range vs fire duration
-    valid_duration = df[df['duration_days'] > 0]
-    if len(valid_duration) > 100:
-        axes[1, 0].scatter(valid_duration['temp_range'], valid_duration['duration_days'], 
+    duration_days = data['duration_days']
+    if len(duration_days) > 100:
+        axes[1, 0].scatter(data['duration_temp_range'], duration_days, 
                           alpha=0.3, s=10, color='purple')
         axes[1, 0].set_xlabel('Temperature Range During Fire (°C)', fontsize=12)
         axes[1, 0].set_ylabel('Fire Duration (days)', fontsize=12)
         axes[1, 0].set_title('Fire Duration vs. Temperature Variation', fontsize=14, fontweight='bold')
-        axes[1, 0].set_ylim([0, min(valid_duration['duration_days'].quantile(0.95), 100)])
+        axes[1, 0].set_ylim([0, min(data['duration_q95'], 100)])
         axes[1, 0].grid(True, alpha=0.3)
     
     # 4. Fire size class distribution by temperature quartile
-    df['temp_quartile'] = pd.qcut(df['discovery_temp'], q=4, labels=['Q1 (Cold)', 'Q2', 'Q3', 'Q4 (Hot)'])
-    size_class_temp = pd.crosstab(df['temp_quartile'], df['FIRE_SIZE_CLASS'], normalize='index') * 100
-    size_class_temp.plot(kind='bar', stacked=True, ax=axes[1, 1], colormap='YlOrRd')
+    data['size_class_temp'].plot(kind='bar', stacked=True, ax=axes[1, 1], colormap='YlOrRd')
     axes[1, 1].set_xlabel('Temperature Quartile', fontsize=12)
     axes[1, 1].set_ylabel('Percentage', fontsize=12)
     axes[1, 1].set_title('Fire Size Class Distribution by Temperature', fontsize=14, fontweight='bold')
@@ -159,20 +421,53 @@ def plot_temperature_relationships(df: pd.DataFrame, output_dir: Path):
     axes[1, 1].set_xticklabels(axes[1, 1].get_xticklabels(), rotation=45)
     axes[1, 1].grid(True, axis='y', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_dir / 'temperature_relationships.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_dir / 'temperature_relationships.png', dpi=300, pil_kwargs=PNG_SAVE_OPTIONS)
+    plt.close(fig)
     print("  ✓ Saved temperature_relationships.png")
 
 
-def plot_fire_causes(df: pd.DataFrame, output_dir: Path):
-    """Analyze and visualize fire causes."""
-    print("\nGenerating fire cause analysis plots...")
+def plot_temperature_relationships(df: pd.DataFrame, output_dir: Path):
+    """Plot relationships between temperature and fire characteristics."""
+    print("\nGenerating temperature relationship plots...")
+    draw_temperature_relationships(compute_temperature_relationships(df), output_dir)
+
+
+def compute_fire_causes(df: pd.DataFrame, aggs: dict[str, pd.DataFrame]) -> dict:
+    """Precompute the series drawn by draw_fire_causes."""
+    by_cause = aggs['cause']
+    cause_counts = by_cause['count'].head(10)
+    top_causes = cause_counts.head(8).index
     
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    # Seasonal counts of the top 4 causes, on categorical codes: each cause code
+    # maps to its top-4 slot (or -1), with a trailing -1 so missing causes
+    # (code -1) are dropped too
+    top_4_causes = cause_counts.head(4).index
+    causes = df['STAT_CAUSE_DESCR'].cat
+    cause_slot = np.full(len(causes.categories) + 1, -1, dtype=np.int64)
+    cause_slot[causes.categories.get_indexer(top_4_causes)] = np.arange(len(top_4_causes))
+    slots = cause_slot[causes.codes.to_numpy()]
+    in_top = slots >= 0
+    season_codes = df['season'].cat.codes.to_numpy()[in_top]
+    counts = np.bincount(season_codes * len(top_4_causes) + slots[in_top],
+                         minlength=len(SEASON_ORDER) * len(top_4_causes))
+    season_cause = pd.DataFrame(counts.reshape(len(SEASON_ORDER), len(top_4_causes)),
+                                index=pd.Index(SEASON_ORDER, name='season'),
+                                columns=pd.Index(top_4_causes, name='STAT_CAUSE_DESCR'))
+    
+    return {
+        'cause_counts': cause_counts,
+        'cause_temp': by_cause.loc[top_causes, 'mean_temp'].sort_values(),
+        'season_cause': season_cause,
+        'cause_size': by_cause.loc[top_causes, 'mean_size'].sort_values(ascending=False),
+    }
+
+
+def draw_fire_causes(data: dict, output_dir: Path):
+    """Draw the fire cause figure from precomputed series."""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), layout='constrained')
     
     # 1. Top causes overall
-    cause_counts = df['STAT_CAUSE_DESCR'].value_counts().head(10)
+    cause_counts = data['cause_counts']
     axes[0, 0].barh(range(len(cause_counts)), cause_counts.values, color='coral')
     axes[0, 0].set_yticks(range(len(cause_counts)))
     axes[0, 0].set_yticklabels(cause_counts.index, fontsize=10)
@@ -182,8 +477,7 @@ def plot_fire_causes(df: pd.DataFrame, output_dir: Path):
     axes[0, 0].grid(True, axis='x', alpha=0.3)
     
     # 2. Average temperature by cause (top causes)
-    top_causes = cause_counts.head(8).index
-    cause_temp = df[df['STAT_CAUSE_DESCR'].isin(top_causes)].groupby('STAT_CAUSE_DESCR')['discovery_temp'].mean().sort_values()
+    cause_temp = data['cause_temp']
     axes[0, 1].barh(range(len(cause_temp)), cause_temp.values, color='skyblue')
     axes[0, 1].set_yticks(range(len(cause_temp)))
     axes[0, 1].set_yticklabels(cause_temp.index, fontsize=10)
@@ -193,11 +487,7 @@ def plot_fire_causes(df: pd.DataFrame, output_dir: Path):
     axes[0, 1].grid(True, axis='x', alpha=0.3)
     
     # 3. Seasonal variation by cause (top 4 causes)
-    top_4_causes = cause_counts.head(4).index
-    season_order = ['Winter', 'Spring', 'Summer', 'Fall']
-    season_cause = df[df['STAT_CAUSE_DESCR'].isin(top_4_causes)].groupby(['season', 'STAT_CAUSE_DESCR']).size().unstack(fill_value=0)
-    season_cause = season_cause.reindex(season_order)
-    season_cause.plot(kind='bar', ax=axes[1, 0], width=0.8)
+    data['season_cause'].plot(kind='bar', ax=axes[1, 0], width=0.8)
     axes[1, 0].set_xlabel('Season', fontsize=12)
     axes[1, 0].set_ylabel('Number of Fires', fontsize=12)
     axes[1, 0].set_title('Top Fire Causes by Season', fontsize=14, fontweight='bold')
@@ -206,7 +496,7 @@ def plot_fire_causes(df: pd.DataFrame, output_dir: Path):
     axes[1, 0].grid(True, axis='y', alpha=0.3)
     
     # 4. Fire size by cause (top causes)
-    cause_size = df[df['STAT_CAUSE_DESCR'].isin(top_causes)].groupby('STAT_CAUSE_DESCR')['FIRE_SIZE'].mean().sort_values(ascending=False)
+    cause_size = data['cause_size']
     axes[1, 1].barh(range(len(cause_size)), cause_size.values, color='orange')
     axes[1, 1].set_yticks(range(len(cause_size)))
     axes[1, 1].set_yticklabels(cause_size.index, fontsize=10)
@@ -215,20 +505,51 @@ def plot_fire_causes(df: pd.DataFrame, output_dir: Path):
     axes[1, 1].invert_yaxis()
     axes[1, 1].grid(True, axis='x', alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_dir / 'fire_causes.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_dir / 'fire_causes.png', dpi=300, pil_kwargs=PNG_SAVE_OPTIONS)
+    plt.close(fig)
     print("  ✓ Saved fire_causes.png")
 
 
-def plot_geographic_analysis(df: pd.DataFrame, output_dir: Path):
-    """Generate geographic analysis plots."""
-    print("\nGenerating geographic analysis plots...")
+def plot_fire_causes(df: pd.DataFrame, aggs: dict[str, pd.DataFrame], output_dir: Path):
+    """Analyze and visualize fire causes."""
+    print("\nGenerating fire cause analysis plots...")
+    draw_fire_causes(compute_fire_causes(df, aggs), output_dir)
+
+
+def compute_geographic_analysis(df: pd.DataFrame, aggs: dict[str, pd.DataFrame]) -> dict:
+    """Precompute the series and rasters drawn by draw_geographic_analysis."""
+    by_state = aggs['state']
+    state_counts = by_state['count'].head(15)
+    top_states = state_counts.head(15).index
     
-    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    lon = df['LONGITUDE'].to_numpy()
+    lat = df['LATITUDE'].to_numpy()
+    temps = df['discovery_temp'].to_numpy()
+    
+    # Latitude vs temperature density (log-scaled when drawn)
+    lat_temp_count, lat_edges, temp_edges = np.histogram2d(lat, temps, bins=LAT_TEMP_GRID_BINS)
+    
+    # Mean temperature per map grid cell
+    temp_sum, _, _ = np.histogram2d(lon, lat, bins=MAP_GRID_BINS, range=MAP_EXTENT, weights=temps)
+    fire_count, _, _ = np.histogram2d(lon, lat, bins=MAP_GRID_BINS, range=MAP_EXTENT)
+    with np.errstate(invalid='ignore'):
+        cell_temp = temp_sum / fire_count
+    
+    return {
+        'state_counts': state_counts,
+        'state_temp': by_state.loc[top_states, 'mean_temp'].sort_values(),
+        'lat_temp_count': lat_temp_count,
+        'lat_temp_extent': [lat_edges[0], lat_edges[-1], temp_edges[0], temp_edges[-1]],
+        'cell_temp': cell_temp,
+    }
+
+
+def draw_geographic_analysis(data: dict, output_dir: Path):
+    """Draw the geographic analysis figure from precomputed series and rasters."""
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12), layout='constrained')
     
     # 1. Top states by fire count
-    state_counts = df['STATE'].value_counts().head(15)
+    state_counts = data['state_counts']
     axes[0, 0].barh(range(len(state_counts)), state_counts.values, color='seagreen')
     axes[0, 0].set_yticks(range(len(state_counts)))
     axes[0, 0].set_yticklabels(state_counts.index, fontsize=10)
@@ -238,8 +559,7 @@ def plot_geographic_analysis(df: pd.DataFrame, output_dir: Path):
     axes[0, 0].grid(True, axis='x', alpha=0.3)
     
     # 2. Average temperature by state (top states)
-    top_states = state_counts.head(15).index
-    state_temp = df[df['STATE'].isin(top_states)].groupby('STATE')['discovery_temp'].mean().sort_values()
+    state_temp = data['state_temp']
     axes[0, 1].barh(range(len(state_temp)), state_temp.values, color='indianred')
     axes[0, 1].set_yticks(range(len(state_temp)))
     axes[0, 1].set_yticklabels(state_temp.index, fontsize=10)
@@ -248,34 +568,68 @@ def plot_geographic_analysis(df: pd.DataFrame, output_dir: Path):
     axes[0, 1].invert_yaxis()
     axes[0, 1].grid(True, axis='x', alpha=0.3)
     
-    # 3. Latitude vs Temperature
-    axes[1, 0].scatter(df['LATITUDE'], df['discovery_temp'], alpha=0.1, s=5, color='blue')
+    # 3. Latitude vs Temperature (density raster instead of one marker per fire)
+    lat_temp_count = np.ma.masked_equal(data['lat_temp_count'], 0)
+    axes[1, 0].imshow(lat_temp_count.T, extent=data['lat_temp_extent'], origin='lower',
+                      aspect='auto', cmap='Blues', norm=LogNorm(), interpolation='nearest')
     axes[1, 0].set_xlabel('Latitude', fontsize=12)
     axes[1, 0].set_ylabel('Discovery Temperature (°C)', fontsize=12)
     axes[1, 0].set_title('Fire Temperature by Latitude', fontsize=14, fontweight='bold')
     axes[1, 0].grid(True, alpha=0.3)
     
-    # 4. Geographic scatter (simple map)
-    scatter = axes[1, 1].scatter(df['LONGITUDE'], df['LATITUDE'], 
-                                 c=df['discovery_temp'], cmap='RdYlBu_r',
-                                 s=1, alpha=0.3)
+    # 4. Geographic map: mean temperature per grid cell
+    scatter = axes[1, 1].imshow(data['cell_temp'].T, extent=[*MAP_EXTENT[0], *MAP_EXTENT[1]],
+                                origin='lower', aspect='auto', cmap='RdYlBu_r',
+                                interpolation='nearest')
     axes[1, 1].set_xlabel('Longitude', fontsize=12)
     axes[1, 1].set_ylabel('Latitude', fontsize=12)
     axes[1, 1].set_title('Geographic Distribution of Fires (colored by temperature)', 
                          fontsize=14, fontweight='bold')
     cbar = plt.colorbar(scatter, ax=axes[1, 1])
     cbar.set_label('Temperature (°C)', fontsize=10)
-    axes[1, 1].set_xlim([-130, -65])
-    axes[1, 1].set_ylim([25, 50])
+    axes[1, 1].set_xlim(MAP_EXTENT[0])
+    axes[1, 1].set_ylim(MAP_EXTENT[1])
     
-    plt.tight_layout()
-    plt.savefig(output_dir / 'geographic_analysis.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_dir / 'geographic_analysis.png', dpi=300, pil_kwargs=PNG_SAVE_OPTIONS)
+    plt.close(fig)
     print("  ✓ Saved geographic_analysis.png")
 
 
-def generate_statistics(df: pd.DataFrame, output_dir: Path):
-    """Generate summary statistics and correlations."""
+def plot_geographic_analysis(df: pd.DataFrame, aggs: dict[str, pd.DataFrame], output_dir: Path):
+    """Generate geographic analysis plots."""
+    print("\nGenerating geographic analysis plots...")
+    draw_geographic_analysis(compute_geographic_analysis(df, aggs), output_dir)
+
+
+def pairwise_correlation(df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Pearson correlation matrix with pairwise-complete observations.
+    
+    Equivalent to DataFrame.corr(), but computed from a few matrix products
+    over one contiguous block instead of a Python loop over column pairs.
+    Columns are centred first to keep the sums well conditioned.
+    """
+    values = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float64))
+    valid = ~np.isnan(values)
+    values = np.where(valid, values - np.nanmean(values, axis=0), 0.0)
+    valid = valid.astype(np.float64)
+    
+    # Entry [i, j] of each product sums over rows where both i and j are valid
+    n = valid.T @ valid
+    sums = values.T @ valid
+    sq_sums = (values ** 2).T @ valid
+    cross = values.T @ values
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / n
+        cov = cross / n - means * means.T
+        var = sq_sums / n - means ** 2
+        corr = cov / np.sqrt(var * var.T)
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def generate_statistics(df: pd.DataFrame, aggs: dict[str, pd.DataFrame], output_dir: Path) -> pd.DataFrame:
+    """Generate summary statistics and correlations; returns the correlation matrix."""
     print("\nGenerating statistical summary...")
     
     stats = []
@@ -305,24 +659,20 @@ def generate_statistics(df: pd.DataFrame, output_dir: Path):
     # Correlation analysis
     stats.append(f"\nCorrelation Analysis:")
     corr_vars = ['discovery_temp', 'mean_temp', 'temp_range', 'FIRE_SIZE', 'duration_days']
-    corr_matrix = df[corr_vars].corr()
+    corr_matrix = pairwise_correlation(df, corr_vars)
     stats.append(f"\nTemperature vs Fire Size correlation: {corr_matrix.loc['discovery_temp', 'FIRE_SIZE']:.3f}")
     stats.append(f"Temperature range vs Duration correlation: {corr_matrix.loc['temp_range', 'duration_days']:.3f}")
     stats.append(f"Mean temp vs Fire Size correlation: {corr_matrix.loc['mean_temp', 'FIRE_SIZE']:.3f}")
     
     # Seasonal breakdown
     stats.append(f"\nSeasonal Breakdown:")
-    season_stats = df.groupby('season').agg({
-        'OBJECTID': 'count',
-        'discovery_temp': 'mean',
-        'FIRE_SIZE': 'mean'
-    }).round(2)
+    season_stats = aggs['season'].round(2)
     season_stats.columns = ['Count', 'Avg Temp (°C)', 'Avg Size (acres)']
-    stats.append(season_stats.to_string())
+    stats.append(season_stats.to_string(float_format='{:.2f}'.format))
     
     # Top causes
     stats.append(f"\nTop 5 Fire Causes:")
-    top_causes = df['STAT_CAUSE_DESCR'].value_counts().head(5)
+    top_causes = aggs['cause']['count'].head(5)
     for cause, count in top_causes.items():
         pct = (count / len(df)) * 100
         stats.append(f"  {cause}: {count:,} ({pct:.1f}%)")
@@ -335,15 +685,18 @@ def generate_statistics(df: pd.DataFrame, output_dir: Path):
     print(stats_text)
     print(f"\n  ✓ Saved statistics_summary.txt")
     
-    # Generate correlation heatmap
-    fig, ax = plt.subplots(figsize=(10, 8))
+    return corr_matrix
+
+
+def draw_correlation_heatmap(corr_matrix: pd.DataFrame, output_dir: Path):
+    """Draw the correlation heatmap."""
+    fig, ax = plt.subplots(figsize=(10, 8), layout='constrained')
     sns.heatmap(corr_matrix, annot=True, fmt='.3f', cmap='coolwarm', center=0,
                 square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
     ax.set_title('Correlation Matrix: Temperature and Fire Characteristics', 
                  fontsize=14, fontweight='bold', pad=20)
-    plt.tight_layout()
-    plt.savefig(output_dir / 'correlation_heatmap.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_dir / 'correlation_heatmap.png', dpi=300, pil_kwargs=PNG_SAVE_OPTIONS)
+    plt.close(fig)
     print("  ✓ Saved correlation_heatmap.png")
 
 
@@ -361,22 +714,57 @@ def main(argv: Optional[list[str]] = None) -> int:
         default="reports",
         help="Output directory for plots and statistics",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse the CSV instead of reusing (and writing) the cleaned Parquet cache",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=5,
+        help="Worker processes used to render the figures (1 renders in-process)",
+    )
     
     args = parser.parse_args(argv)
     
     # Load and clean data
-    df = load_and_clean_data(args.input)
+    df = load_and_clean_data(args.input, use_cache=not args.no_cache)
     
     # Create output directory
     output_dir = create_output_dir(args.output)
     print(f"\nOutput directory: {output_dir}")
     
-    # Generate all visualizations and statistics
-    plot_temporal_trends(df, output_dir)
-    plot_temperature_relationships(df, output_dir)
-    plot_fire_causes(df, output_dir)
-    plot_geographic_analysis(df, output_dir)
-    generate_statistics(df, output_dir)
+    # Group-by aggregates shared by the plots and the summary
+    aggs = compute_group_aggregates(df)
+    
+    # Reduce the frame to the small arrays each figure needs
+    print("\nPreparing plot data...")
+    figures = [
+        (draw_temporal_trends, compute_temporal_trends(df, aggs)),
+        (draw_temperature_relationships, compute_temperature_relationships(df)),
+        (draw_fire_causes, compute_fire_causes(df, aggs)),
+        (draw_geographic_analysis, compute_geographic_analysis(df, aggs)),
+    ]
+    corr_matrix = generate_statistics(df, aggs, output_dir)
+    figures.append((draw_correlation_heatmap, corr_matrix))
+    
+    # Render the figures; they are independent, so each gets its own process
+    # and only the precomputed arrays (not the DataFrame) are sent over. The
+    # workers are spawned rather than forked: forking after the numba
+    # aggregation kernel has started its thread pool can deadlock them
+    print("\nRendering figures...")
+    if args.workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(args.workers, len(figures)),
+            mp_context=multiprocessing.get_context('spawn'),
+        ) as executor:
+            futures = [executor.submit(draw, data, output_dir) for draw, data in figures]
+            for future in futures:
+                future.result()
+    else:
+        for draw, data in figures:
+            draw(data, output_dir)
     
     print(f"\n{'='*80}")
     print("✓ Analysis complete! All plots and statistics saved to:", output_dir)
@@ -63,6 +63,9 @@ class DataConfig:
     # Target variable
     target_column: str = "fire_occurred"
     
+    # Also export processed features as CSV (Parquet is always written)
+    export_csv: bool = False
+    
     def __post_init__(self):
         if self.temperature_countries is None:
             self.temperature_countries = ["United States"]
@@ -7,20 +7,37 @@ This module handles:
 3. Feature engineering (anomalies, trends, lags, rolling statistics)
 4. Creation of training-ready datasets
 """
+import dataclasses
+import hashlib
+import json
 import logging
 import sqlite3
 from pathlib import Path
 from typing import Optional, Tuple
 
+import numba
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pandas.tseries.offsets import MonthEnd
+from scipy.spatial import cKDTree
 
 from src.config import DataConfig, RAW_DATA_DIR, PROCESSED_DATA_DIR, WILDFIRE_DB, TEMP_BY_CITY
 from src.utils import setup_logging
 
 logger = setup_logging()
 
+# Rows fetched from SQLite per chunk; chunks are downcast before concatenation
+SQL_CHUNK_SIZE = 200_000
+
+# Connection settings for the bulk reads of the Fires table
+SQLITE_READ_PRAGMAS = [
+    "PRAGMA mmap_size = 1099511627776",  # map up to 1 TB (capped by the file size)
+    "PRAGMA cache_size = -262144",  # 256 MB page cache
+    "PRAGMA temp_store = MEMORY",
+]
+
 
 def load_temperature_data(
     config: DataConfig,
@@ -52,8 +69,8 @@ def load_temperature_data(
     
     # Parse dates
     df["dt"] = pd.to_datetime(df["dt"])
-    df["year"] = df["dt"].dt.year
-    df["month"] = df["dt"].dt.month
+    df["year"] = df["dt"].dt.year.astype(np.int16)
+    df["month"] = df["dt"].dt.month.astype(np.int8)
     
     # Filter by country if applicable
     if "country" in df.columns and config.temperature_countries:
@@ -65,6 +82,11 @@ def load_temperature_data(
     # Remove missing temperatures
     df = df.dropna(subset=["averagetemperature"])
     
+    # Repeated names as categoricals: one string per city/country, integer codes per row
+    for column in ["city", "country"]:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    
     # Rename for consistency
     df = df.rename(columns={
         "averagetemperature": "avg_temp",
@@ -101,6 +123,10 @@ def load_wildfire_data(config: DataConfig, db_path: Optional[Path] = None) -> pd
     
     # Connect to database
     conn = sqlite3.connect(db_path)
+    # The query is a read-only bulk scan: memory-map the file and give the
+    # page cache and temp storage room instead of going through small reads
+    for pragma in SQLITE_READ_PRAGMAS:
+        conn.execute(pragma)
     
     # Query relevant columns
     query = """
@@ -120,11 +146,22 @@ def load_wildfire_data(config: DataConfig, db_path: Optional[Path] = None) -> pd
         AND LONGITUDE IS NOT NULL
     """
     
-    df = pd.read_sql_query(query, conn, params=(config.start_year, config.end_year))
+    # Stream the result in chunks, downcasting numeric columns as they arrive
+    # (float32 is ample for coordinates and fire sizes)
+    chunks = []
+    for chunk in pd.read_sql_query(
+        query, conn, params=(config.start_year, config.end_year), chunksize=SQL_CHUNK_SIZE
+    ):
+        chunk["year"] = chunk["year"].astype(np.int16)
+        chunk["day_of_year"] = chunk["day_of_year"].astype(np.int16)
+        for column in ["latitude", "longitude", "fire_size"]:
+            chunk[column] = chunk[column].astype(np.float32)
+        chunks.append(chunk)
     conn.close()
+    df = pd.concat(chunks, ignore_index=True)
     
     # Convert day of year to month (approximate)
-    df["month"] = ((df["day_of_year"] - 1) // 30.4).astype(int) + 1
+    df["month"] = ((df["day_of_year"] - 1) // 30.4).astype(np.int8) + 1
     df["month"] = df["month"].clip(1, 12)
     
     # Clean state names (trim whitespace, handle abbreviations)
@@ -147,6 +184,10 @@ def load_wildfire_data(config: DataConfig, db_path: Optional[Path] = None) -> pd
     df["state_full"] = df["state"].map(state_abbrev_map).fillna(df["state"])
     df = df.rename(columns={"state": "state_abbrev", "state_full": "state"})
     
+    # Low-cardinality string columns as categoricals
+    for column in ["state", "state_abbrev", "county", "fire_size_class"]:
+        df[column] = df[column].astype("category")
+    
     # Create fire occurrence indicator (all records are fires)
     df["fire_occurred"] = 1
     
@@ -158,13 +199,26 @@ def load_wildfire_data(config: DataConfig, db_path: Optional[Path] = None) -> pd
     return df
 
 
+def _unit_vectors(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Convert lat/lon in degrees to 3D unit vectors on the sphere."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
 def find_nearest_city_vectorized(
     wildfire_df: pd.DataFrame,
     cities_df: pd.DataFrame,
     max_distance_km: float = 150,
 ) -> pd.Series:
     """
-    Find nearest city for each wildfire using vectorized Haversine distance.
+    Find nearest city for each wildfire with a k-d tree over unit vectors.
+    
+    The straight-line (chord) distance between points on the unit sphere is
+    monotonic in the great-circle distance, so a plain Euclidean k-d tree
+    finds the same nearest city as a haversine search, with the queries
+    spread over all cores.
     
     Args:
         wildfire_df: DataFrame with wildfire locations (latitude, longitude)
@@ -174,47 +228,45 @@ def find_nearest_city_vectorized(
     Returns:
         Series of nearest city names (or None for no match)
     """
-    from numpy import radians, sin, cos, arcsin, sqrt, nan
-    
     logger.info(f"Finding nearest city for {len(wildfire_df):,} wildfires...")
     
-    # Convert to radians
-    wf_lat = radians(wildfire_df["latitude"].values)
-    wf_lon = radians(wildfire_df["longitude"].values)
-    city_lat = radians(cities_df["latitude"].values)
-    city_lon = radians(cities_df["longitude"].values)
+    # One tree over the cities, one k=1 query for all wildfires
+    tree = cKDTree(_unit_vectors(cities_df["latitude"], cities_df["longitude"]))
+    chords, indices = tree.query(
+        _unit_vectors(wildfire_df["latitude"], wildfire_df["longitude"]), k=1, workers=-1
+    )
+    # Chord length -> great-circle distance
+    distances_km = 2 * np.arcsin(np.clip(chords / 2, 0, 1)) * 6371  # Earth radius in km
+    
+    # Only keep matches within max distance
+    nearest_cities = np.where(
+        distances_km <= max_distance_km,
+        cities_df["city"].to_numpy()[indices],
+        None,
+    )
     
-    nearest_cities = []
+    return pd.Series(nearest_cities, index=wildfire_df.index)
+
+
+def group_mode(df: pd.DataFrame, key: str, column: str) -> pd.Series:
+    """
+    Most frequent non-null value of a column within each key group.
     
-    # Process in batches to avoid memory issues
-    batch_size = 5000
-    for i in range(0, len(wildfire_df), batch_size):
-        batch_wf_lat = wf_lat[i:i+batch_size, np.newaxis]
-        batch_wf_lon = wf_lon[i:i+batch_size, np.newaxis]
-        
-        # Broadcasting: (batch_size, 1) and (1, n_cities) -> (batch_size, n_cities)
-        dlat = city_lat - batch_wf_lat
-        dlon = city_lon - batch_wf_lon
-        
-        a = sin(dlat/2)**2 + cos(batch_wf_lat) * cos(city_lat) * sin(dlon/2)**2
-        c = 2 * arcsin(sqrt(np.clip(a, 0, 1)))
-        distances = 6371 * c  # Earth radius in km
-        
-        # Find nearest city for each wildfire in batch
-        min_indices = distances.argmin(axis=1)
-        min_distances = distances[np.arange(len(distances)), min_indices]
-        
-        # Only keep matches within max distance
-        batch_cities = [
-            cities_df.iloc[idx]["city"] if dist <= max_distance_km else None
-            for idx, dist in zip(min_indices, min_distances)
-        ]
-        nearest_cities.extend(batch_cities)
-        
-        if (i // batch_size + 1) % 10 == 0:
-            logger.info(f"  Processed {i + len(batch_cities):,} / {len(wildfire_df):,} wildfires")
+    Equivalent to groupby(key)[column].agg(lambda x: x.mode().iloc[0]) (ties
+    go to the smallest value), but computed from one grouped count instead of
+    a Python-level mode per group.
     
-    return pd.Series(nearest_cities, index=wildfire_df.index)
+    Args:
+        df: Input DataFrame
+        key: Grouping column
+        column: Column to take the mode of
+        
+    Returns:
+        Series of modes indexed by key (groups with only nulls are absent)
+    """
+    counts = df.groupby([key, column], observed=True).size().reset_index(name="n")
+    counts = counts.sort_values(["n", column], ascending=[False, True], kind="stable")
+    return counts.drop_duplicates(key).set_index(key)[column]
 
 
 def merge_wildfire_temperature(
@@ -242,21 +294,14 @@ def merge_wildfire_temperature(
     us_temp = temperature_df[temperature_df["country"] == "United States"].copy()
     cities = us_temp[["city", "latitude", "longitude"]].drop_duplicates()
     
-    # Parse lat/lon from format like "32.95N" to numeric
-    def parse_coordinate(coord_str, coord_type):
-        """Convert '32.95N' or '100.53W' to numeric with proper sign."""
-        coord_str = str(coord_str).strip()
-        # Extract numeric part and direction
-        direction = coord_str[-1].upper()
-        value = float(coord_str[:-1])
+    # Parse lat/lon from format like "32.95N" to numeric, for all cities at once
+    for column, negative in [("latitude", "S"), ("longitude", "W")]:
+        coords = cities[column].astype(str).str.strip()
+        # Extract numeric part and direction; unparseable entries become NaN
+        value = pd.to_numeric(coords.str[:-1], errors="coerce")
+        direction = coords.str[-1].str.upper()
         # Apply sign based on direction
-        if coord_type == "lat":
-            return value if direction == "N" else -value
-        else:  # lon
-            return -value if direction == "W" else value
-    
-    cities["latitude"] = cities["latitude"].apply(lambda x: parse_coordinate(x, "lat"))
-    cities["longitude"] = cities["longitude"].apply(lambda x: parse_coordinate(x, "lon"))
+        cities[column] = value.where(direction != negative, -value)
     cities = cities.dropna(subset=["latitude", "longitude"])
     
     logger.info(f"Temperature dataset has {len(cities):,} unique US cities with valid coordinates")
@@ -275,13 +320,13 @@ def merge_wildfire_temperature(
     wildfires_matched = wildfire_df[wildfire_df["nearest_city"].notna()].copy()
     
     # Prepare temperature data: aggregate by city-year-month
-    temp_city_monthly = us_temp.groupby(["city", "year", "month"]).agg({
+    temp_city_monthly = us_temp.groupby(["city", "year", "month"], observed=True).agg({
         "avg_temp": "mean",
         "temp_uncertainty": "mean",
     }).reset_index()
     
     # Create fire occurrence aggregation: count fires per city-year-month
-    fire_counts = wildfires_matched.groupby(["nearest_city", "year", "month"]).size().reset_index(name="fire_count")
+    fire_counts = wildfires_matched.groupby(["nearest_city", "year", "month"], observed=True).size().reset_index(name="fire_count")
     
     # Create complete grid of all city-year-month combinations in temperature data
     # This gives us both fire and non-fire observations
@@ -303,13 +348,13 @@ def merge_wildfire_temperature(
     all_observations["nearest_city"] = all_observations["city"]
     
     # Get representative location data for each city (avg lat/lon from wildfires)
-    city_locations = wildfires_matched.groupby("nearest_city").agg({
+    city_locations = wildfires_matched.groupby("nearest_city", observed=True).agg({
         "latitude": "mean",
         "longitude": "mean",
-        "state": lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else None,
-        "state_abbrev": lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else None,
-        "county": lambda x: x.mode().iloc[0] if len(x.mode()) > 0 else None,
-    }).reset_index()
+    })
+    for column in ["state", "state_abbrev", "county"]:
+        city_locations[column] = group_mode(wildfires_matched, "nearest_city", column)
+    city_locations = city_locations.reset_index()
     
     # Merge location data
     merged = all_observations.merge(
@@ -326,6 +371,70 @@ def merge_wildfire_temperature(
     return merged
 
 
+@numba.njit(cache=True, parallel=True)
+def _city_temperature_features(values, starts, lags, windows):
+    """
+    Anomaly, lag and trailing rolling features for every city series.
+    
+    values holds the series of all cities back to back, city g occupying
+    values[starts[g]:starts[g + 1]]. Cities are processed in parallel, and
+    each city's slice is swept once for all features while it is in cache:
+    - anomaly: value minus the city's mean
+    - temp_lags / anomaly_lags: values shifted by each lag within the city
+    - means / stds: rolling mean and sample std for each window
+    NaNs follow pandas: skipped by the means and stds (rolling with
+    min_periods=1, so the mean needs one value and the std two), and
+    propagated by the lags.
+    """
+    n_values = len(values)
+    anomaly = np.full(n_values, np.nan)
+    temp_lags = np.full((n_values, len(lags)), np.nan)
+    anomaly_lags = np.full((n_values, len(lags)), np.nan)
+    means = np.full((n_values, len(windows)), np.nan)
+    stds = np.full((n_values, len(windows)), np.nan)
+    for g in numba.prange(len(starts) - 1):
+        start, end = starts[g], starts[g + 1]
+        
+        # City mean, for the anomaly
+        count = 0
+        total = 0.0
+        for i in range(start, end):
+            if not np.isnan(values[i]):
+                count += 1
+                total += values[i]
+        city_mean = total / count if count > 0 else np.nan
+        for i in range(start, end):
+            anomaly[i] = values[i] - city_mean
+        
+        for i in range(start, end):
+            # Lags
+            for k in range(len(lags)):
+                if i - lags[k] >= start:
+                    temp_lags[i, k] = values[i - lags[k]]
+                    anomaly_lags[i, k] = anomaly[i - lags[k]]
+            
+            # Rolling windows ending at i
+            for w in range(len(windows)):
+                lo = max(start, i - windows[w] + 1)
+                count = 0
+                total = 0.0
+                for j in range(lo, i + 1):
+                    if not np.isnan(values[j]):
+                        count += 1
+                        total += values[j]
+                if count == 0:
+                    continue
+                mean = total / count
+                means[i, w] = mean
+                if count > 1:
+                    squares = 0.0
+                    for j in range(lo, i + 1):
+                        if not np.isnan(values[j]):
+                            squares += (values[j] - mean) ** 2
+                    stds[i, w] = np.sqrt(squares / (count - 1))
+    return anomaly, temp_lags, anomaly_lags, means, stds
+
+
 def engineer_features(df: pd.DataFrame, config: DataConfig) -> pd.DataFrame:
     """
     Engineer predictive features from merged data.
@@ -348,10 +457,21 @@ def engineer_features(df: pd.DataFrame, config: DataConfig) -> pd.DataFrame:
     
     df = df.copy()
     df = df.sort_values(["nearest_city", "year", "month"]).reset_index(drop=True)
+    input_columns = list(df.columns)
+    
+    # Anomaly, lag and rolling features in one parallel pass over the city
+    # series (rows are sorted by city, so each city is a contiguous slice)
+    city_codes = pd.factorize(df["nearest_city"])[0]
+    city_starts = np.concatenate([[0], np.flatnonzero(np.diff(city_codes)) + 1, [len(df)]])
+    anomaly, temp_lags, anomaly_lags, rolling_means, rolling_stds = _city_temperature_features(
+        df["avg_temp"].to_numpy(dtype=np.float64),
+        city_starts,
+        np.asarray(config.lag_months, dtype=np.int64),
+        np.asarray(config.rolling_windows, dtype=np.int64),
+    )
     
     # 1. Temperature anomaly (deviation from city's historical mean)
-    city_mean_temp = df.groupby("nearest_city")["avg_temp"].transform("mean")
-    df["temp_anomaly"] = df["avg_temp"] - city_mean_temp
+    df["temp_anomaly"] = anomaly
     
     # 2. Seasonal features
     df["is_summer"] = df["month"].isin([6, 7, 8]).astype(int)
@@ -360,24 +480,14 @@ def engineer_features(df: pd.DataFrame, config: DataConfig) -> pd.DataFrame:
     df["month_cos"] = np.cos(2 * np.pi * df["month"] / 12)
     
     # 3. Lag features (previous months' temperatures)
-    for lag in config.lag_months:
-        df[f"temp_lag_{lag}m"] = df.groupby("nearest_city")["avg_temp"].shift(lag)
-        df[f"anomaly_lag_{lag}m"] = df.groupby("nearest_city")["temp_anomaly"].shift(lag)
+    for k, lag in enumerate(config.lag_months):
+        df[f"temp_lag_{lag}m"] = temp_lags[:, k]
+        df[f"anomaly_lag_{lag}m"] = anomaly_lags[:, k]
     
     # 4. Rolling statistics
-    for window in config.rolling_windows:
-        df[f"temp_rolling_mean_{window}m"] = (
-            df.groupby("nearest_city")["avg_temp"]
-            .rolling(window, min_periods=1)
-            .mean()
-            .reset_index(0, drop=True)
-        )
-        df[f"temp_rolling_std_{window}m"] = (
-            df.groupby("nearest_city")["avg_temp"]
-            .rolling(window, min_periods=1)
-            .std()
-            .reset_index(0, drop=True)
-        )
+    for w, window in enumerate(config.rolling_windows):
+        df[f"temp_rolling_mean_{window}m"] = rolling_means[:, w]
+        df[f"temp_rolling_std_{window}m"] = rolling_stds[:, w]
     
     # 5. Trend feature (year as continuous variable, normalized)
     df["year_normalized"] = (df["year"] - df["year"].min()) / (df["year"].max() - df["year"].min())
@@ -385,20 +495,57 @@ def engineer_features(df: pd.DataFrame, config: DataConfig) -> pd.DataFrame:
     # 6. Interaction features
     df["temp_anomaly_x_summer"] = df["temp_anomaly"] * df["is_summer"]
     
-    # Drop rows with NaN from lag/rolling features (early periods)
+    # Drop rows with NaN from lag/rolling features (early periods) and rows
+    # with missing merged inputs. With complete temperatures, the derived
+    # features are only NaN in the first rows of each city (up to the largest
+    # lag, and the first row for the rolling std), so an explicit boundary
+    # mask plus a NaN check of the input columns replaces a full dropna scan
     initial_len = len(df)
-    df = df.dropna()
+    first_complete_row = max(max(config.lag_months, default=0), 1 if config.rolling_windows else 0)
+    row_in_city = np.arange(len(df)) - np.repeat(city_starts[:-1], np.diff(city_starts))
+    keep = (row_in_city >= first_complete_row) & df[input_columns].notna().all(axis=1).to_numpy()
+    df = df[keep]
     logger.info(f"Features engineered: {len(df):,} records ({initial_len - len(df):,} dropped due to lag/rolling NaN)")
     
     return df
 
 
-def prepare_datasets(config: Optional[DataConfig] = None) -> Tuple[pd.DataFrame, dict]:
+def features_cache_key(config: DataConfig) -> str:
+    """
+    Fingerprint of the inputs of the data preparation pipeline.
+    
+    Covers the data configuration and the size and modification time of the
+    raw wildfire database and temperature file, so the key changes whenever
+    the pipeline would produce different features.
+    
+    Args:
+        config: Data configuration
+        
+    Returns:
+        Hex digest identifying the inputs
+    """
+    digest = hashlib.blake2b(digest_size=16, usedforsecurity=False)
+    digest.update(json.dumps(dataclasses.asdict(config), sort_keys=True).encode())
+    for source in (WILDFIRE_DB, TEMP_BY_CITY):
+        stat = source.stat()
+        digest.update(f"{source.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def prepare_datasets(
+    config: Optional[DataConfig] = None,
+    use_cache: bool = True,
+) -> Tuple[pd.DataFrame, dict]:
     """
     Main pipeline to prepare training and testing datasets.
     
+    The features Parquet file records the cache key of the inputs it was
+    built from; if the inputs are unchanged, it is loaded instead of rerunning
+    the pipeline.
+    
     Args:
         config: Data configuration (uses default if None)
+        use_cache: Reuse the saved features if their inputs are unchanged
         
     Returns:
         Tuple of (processed_features_df, summary_dict)
@@ -407,28 +554,40 @@ def prepare_datasets(config: Optional[DataConfig] = None) -> Tuple[pd.DataFrame,
         from src.config import DEFAULT_DATA_CONFIG
         config = DEFAULT_DATA_CONFIG
     
-    logger.info("Starting data preparation pipeline...")
-    
-    # 1. Load temperature data
-    temperature_df = load_temperature_data(config)
-    
-    # 2. Load wildfire data from SQLite database
-    wildfire_df = load_wildfire_data(config)
-    
-    # 3. Merge datasets using city-level nearest-neighbor matching
-    merged_df = merge_wildfire_temperature(wildfire_df, temperature_df, config)
-    
-    # 4. Engineer features
-    features_df = engineer_features(merged_df, config)
-    
-    # 6. Save processed dataset
     output_path = PROCESSED_DATA_DIR / "wildfire_features.parquet"
-    features_df.to_parquet(output_path, index=False)
-    logger.info(f"Saved processed features to {output_path}")
-    # Also export as CSV for easy sharing
-    csv_path = PROCESSED_DATA_DIR / "wildfire_features.csv"
-    features_df.to_csv(csv_path, index=False)
-    logger.info(f"Saved processed features (CSV) to {csv_path}")
+    cache_key = features_cache_key(config).encode()
+    
+    if (use_cache and output_path.exists()
+            and (pq.read_schema(output_path).metadata or {}).get(b"features_cache_key") == cache_key):
+        logger.info(f"Loading cached features from {output_path} (inputs unchanged)")
+        features_df = pd.read_parquet(output_path, engine="pyarrow")
+    else:
+        logger.info("Starting data preparation pipeline...")
+        
+        # 1. Load temperature data
+        temperature_df = load_temperature_data(config)
+        
+        # 2. Load wildfire data from SQLite database
+        wildfire_df = load_wildfire_data(config)
+        
+        # 3. Merge datasets using city-level nearest-neighbor matching
+        merged_df = merge_wildfire_temperature(wildfire_df, temperature_df, config)
+        
+        # 4. Engineer features
+        features_df = engineer_features(merged_df, config)
+        
+        # 6. Save processed dataset, tagged with the cache key of its inputs
+        table = pa.Table.from_pandas(features_df, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), b"features_cache_key": cache_key}
+        )
+        pq.write_table(table, output_path, compression="zstd")
+        logger.info(f"Saved processed features to {output_path}")
+        # Optionally also export as CSV for easy sharing
+        if config.export_csv:
+            csv_path = PROCESSED_DATA_DIR / "wildfire_features.csv"
+            features_df.to_csv(csv_path, index=False, chunksize=500_000)
+            logger.info(f"Saved processed features (CSV) to {csv_path}")
     
     # 7. Create summary statistics
     summary = {
@@ -19,34 +19,32 @@ import argparse
 import os
 import sqlite3
 import sys
-from datetime import datetime, timedelta
 from typing import Optional
 
 import numpy as np
 import pandas as pd
 from sklearn.neighbors import BallTree
 
+# Rows fetched from SQLite per chunk; chunks are downcast before concatenation
+SQL_CHUNK_SIZE = 200_000
 
-def parse_latlon(coord_str: str) -> float:
+# Connection settings for the bulk reads of the Fires table
+SQLITE_READ_PRAGMAS = [
+    'PRAGMA mmap_size = 1099511627776',  # map up to 1 TB (capped by the file size)
+    'PRAGMA cache_size = -262144',  # 256 MB page cache
+    'PRAGMA temp_store = MEMORY',
+]
+
+
+def parse_latlon(coords: pd.Series) -> pd.Series:
     """Parse lat/lon from format like '32.95N' or '100.53W' to decimal degrees."""
-    if not isinstance(coord_str, str):
-        return np.nan
-    coord_str = coord_str.strip()
-    if not coord_str:
-        return np.nan
-    
-    # Extract direction and numeric part
-    direction = coord_str[-1].upper()
-    try:
-        value = float(coord_str[:-1])
-    except ValueError:
-        return np.nan
+    # Non-string, empty or malformed entries become NaN
+    coords = coords.str.strip()
+    direction = coords.str[-1].str.upper()
+    value = pd.to_numeric(coords.str[:-1], errors='coerce')
     
     # Apply sign based on direction
-    if direction in ('S', 'W'):
-        value = -value
-    
-    return value
+    return value.where(~direction.isin(['S', 'W']), -value)
 
 
 def haversine_distance(lat1: np.ndarray, lon1: np.ndarray, 
@@ -63,18 +61,20 @@ def haversine_distance(lat1: np.ndarray, lon1: np.ndarray,
     return 6371.0 * c  # Earth radius in km
 
 
-def julian_to_datetime(julian_day: float) -> datetime:
-    """Convert Julian day number to datetime (Unix epoch: JD 2440587.5 = 1970-01-01)."""
-    if pd.isna(julian_day):
-        return pd.NaT
-    unix_days = julian_day - 2440587.5
-    return datetime(1970, 1, 1) + timedelta(days=unix_days)
+def julian_to_datetime(julian_days: pd.Series) -> pd.Series:
+    """Convert Julian day numbers to datetimes (Unix epoch: JD 2440587.5 = 1970-01-01)."""
+    return pd.to_datetime((julian_days - 2440587.5) * 86400, unit='s', origin='unix')
 
 
 def load_fires(db_path: str) -> pd.DataFrame:
     """Load Fires table and convert dates."""
     conn = sqlite3.connect(db_path)
     try:
+        # The query is a read-only bulk scan: memory-map the file and give the
+        # page cache and temp storage room instead of going through small reads
+        for pragma in SQLITE_READ_PRAGMAS:
+            conn.execute(pragma)
+        
         query = """
         SELECT 
             OBJECTID, FOD_ID, FIRE_NAME, FIRE_YEAR,
@@ -88,13 +88,23 @@ def load_fires(db_path: str) -> pd.DataFrame:
           AND LONGITUDE IS NOT NULL
           AND DISCOVERY_DATE IS NOT NULL
         """
-        df = pd.read_sql_query(query, conn)
+        # Stream the result in chunks, downcasting integer columns as they arrive
+        chunks = []
+        for chunk in pd.read_sql_query(query, conn, chunksize=SQL_CHUNK_SIZE):
+            chunk['FIRE_YEAR'] = chunk['FIRE_YEAR'].astype(np.int16)
+            chunk['DISCOVERY_DOY'] = chunk['DISCOVERY_DOY'].astype(np.int16)
+            chunks.append(chunk)
+        df = pd.concat(chunks, ignore_index=True)
     finally:
         conn.close()
     
+    # Low-cardinality string columns as categoricals
+    for column in ['STAT_CAUSE_DESCR', 'FIRE_SIZE_CLASS', 'STATE', 'COUNTY']:
+        df[column] = df[column].astype('category')
+    
     # Convert Julian dates
-    df['discovery_date'] = df['DISCOVERY_DATE'].apply(julian_to_datetime)
-    df['cont_date'] = df['CONT_DATE'].apply(julian_to_datetime)
+    df['discovery_date'] = julian_to_datetime(df['DISCOVERY_DATE'])
+    df['cont_date'] = julian_to_datetime(df['CONT_DATE'])
     
     # Filter to valid date range (1992-2015 per dataset description)
     df = df[(df['discovery_date'].dt.year >= 1992) & (df['discovery_date'].dt.year <= 2015)].copy()
@@ -104,12 +114,16 @@ def load_fires(db_path: str) -> pd.DataFrame:
 
 def load_temperatures(csv_path: str) -> pd.DataFrame:
     """Load US temperature data and parse coordinates."""
-    df = pd.read_csv(csv_path)
+    # City names and coordinate strings repeat for every month of a city
+    df = pd.read_csv(
+        csv_path,
+        dtype={'City': 'category', 'Latitude': 'category', 'Longitude': 'category'},
+    )
     df['dt'] = pd.to_datetime(df['dt'])
     
     # Parse lat/lon from strings like '32.95N', '100.53W'
-    df['lat_parsed'] = df['Latitude'].apply(parse_latlon)
-    df['lon_parsed'] = df['Longitude'].apply(parse_latlon)
+    df['lat_parsed'] = parse_latlon(df['Latitude'])
+    df['lon_parsed'] = parse_latlon(df['Longitude'])
     
     # Drop rows with invalid coordinates
     df = df.dropna(subset=['lat_parsed', 'lon_parsed']).copy()
@@ -132,91 +146,160 @@ def build_city_index(temp_df: pd.DataFrame) -> tuple[pd.DataFrame, BallTree]:
     return cities, tree
 
 
-def match_fire_to_cities(fire_lat: float, fire_lon: float, 
-                         cities: pd.DataFrame, tree: BallTree,
-                         radius_km: float = 150.0, 
-                         fallback_k: int = 5) -> list[str]:
+def match_fires_to_cities(fire_lats: np.ndarray, fire_lons: np.ndarray,
+                          tree: BallTree,
+                          radius_km: float = 150.0,
+                          fallback_k: int = 5) -> tuple[np.ndarray, np.ndarray]:
     """
-    Find cities to use for temperature matching.
+    Find cities to use for temperature matching, for all fires in one query.
     
-    Strategy:
+    Strategy (per fire):
     1. Find all cities within radius_km
     2. If none found, use fallback_k nearest cities
+    
+    Returns (fire_idx, city_idx): one entry per matched fire/city pair,
+    grouped by fire; city_idx indexes the cities frame of build_city_index.
     """
-    fire_coord_rad = np.radians([[fire_lat, fire_lon]])
+    fire_coords_rad = np.radians(np.column_stack([fire_lats, fire_lons]))
     
     # Query within radius
     radius_rad = radius_km / 6371.0  # Convert km to radians
-    indices = tree.query_radius(fire_coord_rad, r=radius_rad)[0]
+    neighbors = tree.query_radius(fire_coords_rad, r=radius_rad)
+    counts = np.fromiter(map(len, neighbors), dtype=np.int64, count=len(neighbors))
+    
+    # Fallback: get k nearest for fires with no city in range
+    no_match = np.flatnonzero(counts == 0)
+    if len(no_match) > 0:
+        _, fallback = tree.query(fire_coords_rad[no_match], k=fallback_k)
+        for i, indices in zip(no_match, fallback):
+            neighbors[i] = indices
+        counts[no_match] = fallback_k
+    
+    fire_idx = np.repeat(np.arange(len(neighbors)), counts)
+    city_idx = np.concatenate(neighbors) if len(neighbors) else np.empty(0, dtype=np.intp)
+    return fire_idx, city_idx
+
+
+def build_monthly_temperature_grid(temp_df: pd.DataFrame) -> tuple[pd.Index, np.datetime64, dict]:
+    """
+    Aggregate temperature records onto a dense (city name x month) grid.
     
-    if len(indices) > 0:
-        return cities.iloc[indices]['City'].tolist()
+    Cities are keyed by name, so records of same-named cities are pooled, as
+    in a City.isin(...) filter. Each cell holds the number of records, the
+    number of non-missing temperatures, their sum, max and min (max/min are
+    -inf/+inf for cells without temperatures).
+    
+    Returns (city_names, first_month, grid), where grid maps each statistic
+    to a flat array indexed by name_code * n_months + month offset.
+    """
+    # One hashing pass gives both the distinct names and each record's code
+    name_codes, names = pd.factorize(temp_df['City'])
+    months = temp_df['dt'].values.astype('datetime64[M]')
+    first_month = months.min()
+    month_offsets = (months - first_month).astype(np.int64)
+    n_months = int(month_offsets.max()) + 1
+    
+    cells = name_codes * n_months + month_offsets
+    n_cells = len(names) * n_months
+    temps = temp_df['AverageTemperature'].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(temps)
+    
+    grid = {
+        'n_months': n_months,
+        'rows': np.bincount(cells, minlength=n_cells),
+        'count': np.bincount(cells[valid], minlength=n_cells),
+        'sum': np.bincount(cells[valid], weights=temps[valid], minlength=n_cells),
+        'max': np.full(n_cells, -np.inf),
+        'min': np.full(n_cells, np.inf),
+    }
+    np.maximum.at(grid['max'], cells[valid], temps[valid])
+    np.minimum.at(grid['min'], cells[valid], temps[valid])
     
-    # Fallback: get k nearest
-    distances, indices = tree.query(fire_coord_rad, k=fallback_k)
-    return cities.iloc[indices[0]]['City'].tolist()
+    return names, first_month, grid
 
 
-def get_temperature_for_fire(fire_row: pd.Series, temp_df: pd.DataFrame,
-                             cities: pd.DataFrame, tree: BallTree) -> dict:
+def get_fire_temperatures(fires_df: pd.DataFrame, temp_df: pd.DataFrame,
+                          cities: pd.DataFrame,
+                          fire_idx: np.ndarray, city_idx: np.ndarray) -> pd.DataFrame:
     """
-    Get temperature statistics for a fire by matching nearby cities.
+    Get temperature statistics for all fires from their matched cities.
     
-    Returns dict with:
-    - matched_cities: list of city names used
-    - discovery_temp: temperature on discovery date
+    Returns one row per fire (in fires_df order) with:
+    - matched_cities: comma-separated city names used
+    - discovery_temp: temperature in the discovery month
     - mean_temp: mean temperature from discovery to containment
     - max_temp: max temperature in period
     - min_temp: min temperature in period
+    - temp_range: max_temp - min_temp
+    Fires without a valid containment date, or without temperature records in
+    the period, fall back to discovery_temp (and a temp_range of 0).
     """
-    fire_lat = fire_row['LATITUDE']
-    fire_lon = fire_row['LONGITUDE']
-    disc_date = fire_row['discovery_date']
-    cont_date = fire_row['cont_date']
-    
-    # Find cities to use
-    matched_cities = match_fire_to_cities(fire_lat, fire_lon, cities, tree)
-    
-    # Filter temperature data to matched cities
-    city_temps = temp_df[temp_df['City'].isin(matched_cities)].copy()
-    
-    # Match on discovery date (monthly data, so match by year-month)
-    disc_month = pd.Timestamp(disc_date.year, disc_date.month, 1)
-    discovery_temps = city_temps[city_temps['dt'] == disc_month]
-    
-    result = {
-        'matched_cities': ','.join(matched_cities),
-        'num_cities': len(matched_cities),
-        'discovery_temp': discovery_temps['AverageTemperature'].mean() if not discovery_temps.empty else np.nan,
-    }
-    
-    # If containment date is valid, get temperature range
-    if pd.notna(cont_date) and cont_date >= disc_date:
-        # Get all months from discovery to containment
-        start_month = disc_month
-        end_month = pd.Timestamp(cont_date.year, cont_date.month, 1)
-        
-        period_temps = city_temps[
-            (city_temps['dt'] >= start_month) & 
-            (city_temps['dt'] <= end_month)
-        ]
-        
-        if not period_temps.empty:
-            result['mean_temp'] = period_temps['AverageTemperature'].mean()
-            result['max_temp'] = period_temps['AverageTemperature'].max()
-            result['min_temp'] = period_temps['AverageTemperature'].min()
-            result['temp_range'] = result['max_temp'] - result['min_temp']
-        else:
-            result['mean_temp'] = result['discovery_temp']
-            result['max_temp'] = result['discovery_temp']
-            result['min_temp'] = result['discovery_temp']
-            result['temp_range'] = 0.0
-    else:
-        # No containment date, use discovery temp for all
-        result['mean_temp'] = result['discovery_temp']
-        result['max_temp'] = result['discovery_temp']
-        result['min_temp'] = result['discovery_temp']
-        result['temp_range'] = 0.0
+    n_fires = len(fires_df)
+    names, first_month, grid = build_monthly_temperature_grid(temp_df)
+    n_months = grid['n_months']
+    
+    # Matched city names per fire, in match order; pairs are contiguous per
+    # fire, so each fire's names are a plain list slice
+    num_cities = np.bincount(fire_idx, minlength=n_fires)
+    pair_names = cities['City'].to_numpy()[city_idx].tolist()
+    ends = np.cumsum(num_cities).tolist()
+    starts = [0] + ends[:-1]
+    result = pd.DataFrame({
+        'matched_cities': [','.join(pair_names[a:b]) for a, b in zip(starts, ends)],
+        'num_cities': num_cities,
+    })
+    
+    # Temperature records are pooled per city name, so each name counts once
+    # per fire; names are resolved to grid rows once per city, not per pair
+    city_name_codes = names.get_indexer(cities['City'])
+    pair_keys = np.unique(fire_idx * len(names) + city_name_codes[city_idx])
+    pair_fire, pair_name = np.divmod(pair_keys, len(names))
+    
+    # Month offsets of discovery and containment (monthly data, so match by year-month)
+    disc_dates = fires_df['discovery_date'].to_numpy()
+    cont_dates = fires_df['cont_date'].to_numpy()
+    disc_month = (disc_dates.astype('datetime64[M]') - first_month).astype(np.int64)
+    cont_month = (cont_dates.astype('datetime64[M]') - first_month).astype(np.int64)
+    has_period = ~np.isnat(cont_dates) & (cont_dates >= disc_dates)
+    
+    def per_fire(fires, values):
+        return np.bincount(fires, weights=values, minlength=n_fires)
+    
+    # Discovery month: one grid cell per fire/city pair
+    start = disc_month[pair_fire]
+    in_grid = (start >= 0) & (start < n_months)
+    cells = pair_name[in_grid] * n_months + start[in_grid]
+    fires = pair_fire[in_grid]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discovery_temp = per_fire(fires, grid['sum'][cells]) / per_fire(fires, grid['count'][cells])
+    result['discovery_temp'] = discovery_temp
+    
+    # Discovery-to-containment period: expand each pair into its months
+    period_pairs = np.flatnonzero(has_period[pair_fire])
+    start = np.maximum(disc_month[pair_fire[period_pairs]], 0)
+    stop = np.minimum(cont_month[pair_fire[period_pairs]], n_months - 1)
+    span = np.maximum(stop - start + 1, 0)
+    expanded = np.repeat(np.arange(len(period_pairs)), span)
+    offsets = np.arange(len(expanded)) - np.repeat(np.cumsum(span) - span, span)
+    cells = pair_name[period_pairs[expanded]] * n_months + start[expanded] + offsets
+    fires = pair_fire[period_pairs[expanded]]
+    
+    period_rows = per_fire(fires, grid['rows'][cells])
+    period_count = per_fire(fires, grid['count'][cells])
+    period_max = np.full(n_fires, -np.inf)
+    period_min = np.full(n_fires, np.inf)
+    np.maximum.at(period_max, fires, grid['max'][cells])
+    np.minimum.at(period_min, fires, grid['min'][cells])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        period_mean = per_fire(fires, grid['sum'][cells]) / period_count
+    period_max[period_count == 0] = np.nan
+    period_min[period_count == 0] = np.nan
+    
+    use_period = has_period & (period_rows > 0)
+    result['mean_temp'] = np.where(use_period, period_mean, discovery_temp)
+    result['max_temp'] = np.where(use_period, period_max, discovery_temp)
+    result['min_temp'] = np.where(use_period, period_min, discovery_temp)
+    result['temp_range'] = np.where(use_period, period_max - period_min, 0.0)
     
     return result
 
@@ -266,20 +349,17 @@ def main(argv: Optional[list[str]] = None) -> int:
     cities, tree = build_city_index(temp_df)
     print(f"Indexed {len(cities):,} unique city locations")
     
-    print("\nMatching fires to temperatures...")
-    temp_results = []
-    
-    for idx, row in fires_df.iterrows():
-        if idx % 10000 == 0 and idx > 0:
-            print(f"  Processed {idx:,} / {len(fires_df):,} fires...")
-        
-        temp_info = get_temperature_for_fire(row, temp_df, cities, tree)
-        temp_results.append(temp_info)
+    print("\nMatching fires to cities...")
+    fire_idx, city_idx = match_fires_to_cities(
+        fires_df['LATITUDE'].to_numpy(), fires_df['LONGITUDE'].to_numpy(), tree
+    )
+    print(f"  Found {len(fire_idx):,} fire-city pairs")
     
+    print("\nMatching fires to temperatures...")
+    temp_results_df = get_fire_temperatures(fires_df, temp_df, cities, fire_idx, city_idx)
     print(f"  Processed {len(fires_df):,} / {len(fires_df):,} fires.")
     
     # Combine with fire data
-    temp_results_df = pd.DataFrame(temp_results)
     merged_df = pd.concat([fires_df.reset_index(drop=True), temp_results_df], axis=1)
     
     # Select final columns
@@ -2,26 +2,80 @@ from pathlib import Path
 
 from ultralytics import YOLO
 import cv2
+import numpy as np
+import torch
 import pygame
 import time
 import threading
+import queue
+import logging
+import logging.handlers
+import gevent
+from gevent.event import AsyncResult
+from gevent.pywsgi import WSGIServer
 from flask import Flask, Response, jsonify
 from flask_cors import CORS
 
+# libjpeg-turbo's SIMD encoder, when PyTurboJPEG and the shared library are installed
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo_jpeg = None
+
 # Configuration
 BASE_DIR = Path(__file__).resolve().parent
 MODEL_PATH = str(BASE_DIR / "best.pt")
+ONNX_MODEL_PATH = BASE_DIR / "best.onnx"
+INT8_MODEL_PATH = BASE_DIR / "best_int8.onnx"  # Produced by quantize_model.py
+ENGINE_MODEL_PATH = BASE_DIR / "best.engine"
+INFERENCE_IMGSZ = 416  # Network input size; cost grows roughly with its square
 CONF_THRESHOLD = 0.5
 FRAME_SKIP = 4
 CROP_TOP_RATIO = 0.15
 CROP_BOTTOM_RATIO = 0.03
 SERVER_PORT = 8001
+JPEG_QUALITY = 80
 ALARM_SOUND = str(BASE_DIR / "alarm.mp3")
 PERSISTENCE_FRAMES = 5
+LOG_LEVEL = logging.INFO  # DEBUG lists every detected box; WARNING keeps only alerts
+SCENE_CHANGE_THRESHOLD = 2.0  # Mean abs pixel change (0-255) on a 64x64 thumbnail that triggers a re-encode
+GPU_BATCH_SIZE = 4  # Detection frames per inference call for video files on a GPU
+
+def export_model(export_path, **export_args):
+    """Export best.pt once and reuse the export until best.pt changes; returns the path to load."""
+    if export_path.exists() and export_path.stat().st_mtime >= Path(MODEL_PATH).stat().st_mtime:
+        return str(export_path)
+    print(f"[INFO] Exporting model to {export_path.name}...")
+    return YOLO(MODEL_PATH).export(imgsz=INFERENCE_IMGSZ, **export_args)
 
 # Initialize model and input source
+# Inference runs on an FP16 TensorRT engine when a CUDA GPU is present, otherwise on an
+# ONNX export (fused graph, multi-threaded ONNX Runtime kernels), preferring the int8
+# quantized one when it is up to date; all are considerably faster than the PyTorch checkpoint
 print("[INFO] Loading model...")
-model = YOLO(MODEL_PATH)
+try:
+    if torch.cuda.is_available():
+        model_file = export_model(ENGINE_MODEL_PATH, format="engine", half=True, workspace=4, device=0,
+                                  dynamic=True, batch=GPU_BATCH_SIZE)
+    elif INT8_MODEL_PATH.exists() and INT8_MODEL_PATH.stat().st_mtime >= Path(MODEL_PATH).stat().st_mtime:
+        model_file = str(INT8_MODEL_PATH)
+    else:
+        model_file = export_model(ONNX_MODEL_PATH, format="onnx", simplify=True, half=False, dynamic=False)
+    model = YOLO(model_file, task="detect")
+except Exception as e:
+    print(f"[WARN] Model export unavailable ({e}); using PyTorch model.")
+    model = YOLO(MODEL_PATH)
+
+# Detection kind per class id (0 = ignored, 1 = fire, 2 = smoke), resolved once from the class names
+FIRE, SMOKE = 1, 2
+CLASS_KIND = np.zeros(max(model.names) + 1, dtype=np.int8)
+for class_id, name in model.names.items():
+    name = name.lower()
+    if 'smoke' in name:
+        CLASS_KIND[class_id] = SMOKE
+    elif 'fire' in name or 'flame' in name:
+        CLASS_KIND[class_id] = FIRE
 
 print("\n[INFO] Select input source:")
 print("1. Webcam")
@@ -45,6 +99,24 @@ else:
     if not cap.isOpened():
         print("[ERROR] Could not access webcam.")
         exit(1)
+    # Keep only the newest frame buffered so detections are not run on stale frames
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+# Video files are throughput-bound, so on a GPU several detection frames share one inference
+# call; the live webcam stays at one frame per call to keep alarm latency low
+batch_size = GPU_BATCH_SIZE if choice == "2" and torch.cuda.is_available() else 1
+
+# Detection loop logging: records are written to stdout by a listener thread, so the
+# loop never blocks on console output
+log = logging.getLogger("fire_detection")
+log.setLevel(LOG_LEVEL)
+log.propagate = False
+log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(log_queue))
+log_console = logging.StreamHandler()
+log_console.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_console)
+log_listener.start()
 
 # Initialize audio alarm
 pygame.mixer.init()
@@ -56,10 +128,16 @@ frame_count = 0
 last_fire_detected = False
 last_smoke_detected = False
 detection_persistence = 0
-last_annotated_frame = None
 latest_jpeg = None
+latest_frame_id = 0
 latest_stats = {}
 frame_lock = threading.Lock()
+# Stream clients wait on frame_signal instead of polling; the encoder thread fires
+# stream_wakeup, which resolves (and replaces) frame_signal inside the server thread
+frame_signal = None
+stream_wakeup = None
+viewers_connected = 0
+encode_queue = queue.Queue(maxsize=2)
 
 # Flask streaming server
 app = Flask(__name__)
@@ -67,16 +145,23 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 app.logger.disabled = True
 
 def mjpeg_stream():
-    global latest_jpeg
-    last_sent = None
-    while True:
-        with frame_lock:
-            current = latest_jpeg
-        if current is not None and current != last_sent:
-            last_sent = current
-            yield (b"--frame\r\n"
-                   b"Content-Type: image/jpeg\r\n\r\n" + current + b"\r\n")
-        time.sleep(0.03)
+    global viewers_connected
+    viewers_connected += 1
+    try:
+        last_sent = 0
+        while True:
+            signal = frame_signal
+            with frame_lock:
+                current = latest_jpeg
+                frame_id = latest_frame_id
+            if current is not None and frame_id != last_sent:
+                last_sent = frame_id
+                yield (b"--frame\r\n"
+                       b"Content-Type: image/jpeg\r\n\r\n" + current + b"\r\n")
+            else:
+                signal.wait(timeout=1.0)
+    finally:
+        viewers_connected -= 1
 
 @app.route("/video")
 def video_feed():
@@ -88,110 +173,202 @@ def stats_feed():
         stats = latest_stats.copy() if latest_stats else {"status": "waiting"}
     return jsonify(stats)
 
+def on_new_frame():
+    global frame_signal
+    signal, frame_signal = frame_signal, AsyncResult()
+    signal.set()
+
 def run_server():
-    app.run(host="0.0.0.0", port=SERVER_PORT, debug=False, threaded=True)
+    # Served by gevent in this thread: each viewer is a greenlet instead of an OS thread
+    global frame_signal, stream_wakeup
+    frame_signal = AsyncResult()
+    wakeup = gevent.get_hub().loop.async_()
+    wakeup.start(on_new_frame)
+    stream_wakeup = wakeup
+    WSGIServer(("0.0.0.0", SERVER_PORT), app, log=None).serve_forever()
 
 server_thread = threading.Thread(target=run_server, daemon=True)
 server_thread.start()
 
+def encode_jpeg(image):
+    if turbo_jpeg is not None:
+        return turbo_jpeg.encode(image, quality=JPEG_QUALITY, jpeg_subsample=TJSAMP_420)
+    ok, buf = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+    return buf.tobytes() if ok else None
+
+# JPEG encoding for the stream runs in its own thread so it does not delay the next detection.
+# Frames are only encoded while someone is watching, and only when the picture or the
+# detection state has changed since the last encoded frame; stats are always updated.
+def encode_worker():
+    global latest_jpeg, latest_frame_id, latest_stats
+    last_thumb = None
+    last_state = None
+    while True:
+        annotated, stats = encode_queue.get()
+        if viewers_connected == 0:
+            with frame_lock:
+                latest_jpeg = None  # A new viewer must not be shown an old picture
+                latest_stats = stats
+            last_thumb = None
+            continue
+
+        thumb = cv2.resize(annotated, (64, 64), interpolation=cv2.INTER_AREA)
+        state = (stats["fire"], stats["smoke"])
+        if (last_thumb is not None and state == last_state
+                and cv2.absdiff(thumb, last_thumb).mean() < SCENE_CHANGE_THRESHOLD):
+            with frame_lock:
+                latest_stats = stats
+            continue
+        last_thumb = thumb
+        last_state = state
+
+        jpeg = encode_jpeg(annotated)
+        if jpeg is not None:
+            with frame_lock:
+                latest_jpeg = jpeg
+                latest_frame_id += 1
+                latest_stats = stats
+            # async watchers are the thread-safe way to wake the gevent hub
+            if stream_wakeup is not None:
+                stream_wakeup.send()
+
+def publish_frame(annotated, stats):
+    # Drop the oldest pending frame if the encoder falls behind
+    try:
+        encode_queue.put_nowait((annotated, stats))
+    except queue.Full:
+        try:
+            encode_queue.get_nowait()
+        except queue.Empty:
+            pass
+        encode_queue.put_nowait((annotated, stats))
+
+encode_thread = threading.Thread(target=encode_worker, daemon=True)
+encode_thread.start()
+
 # Main detection loop
 
-while True:
-    ret, frame = cap.read()
-    if not ret:
-        print("[INFO] End of video/stream.")
-        break
+pending_frames = []
+stream_ended = False
+quit_requested = False
+crop_height = None
+crop_rows = slice(None)
 
-    # Crop out top and bottom portions of the frame
-    h = frame.shape[0]
-    if CROP_TOP_RATIO > 0:
-        crop_top_pixels = int(h * CROP_TOP_RATIO)
+while not stream_ended:
+    # Grab every frame, but only decode the ones that go through detection
+    if not cap.grab():
+        log.info("End of video/stream.")
+        stream_ended = True
     else:
-        crop_top_pixels = 0
+        frame_count += 1
+        
+        # Skip frames for performance; the window keeps showing the last processed frame
+        if frame_count % FRAME_SKIP != 0:
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+            continue
 
-    if CROP_BOTTOM_RATIO > 0:
-        crop_bottom_pixels = int(h * CROP_BOTTOM_RATIO)
-    else:
-        crop_bottom_pixels = 0
-
-    if crop_top_pixels + crop_bottom_pixels < h:
-        frame = frame[crop_top_pixels:h - crop_bottom_pixels, :]
-
-    frame_count += 1
-    
-    if detection_persistence > 0:
-        detection_persistence -= 1
-    
-    # Skip frames for performance
-    if frame_count % FRAME_SKIP != 0:
-        display = last_annotated_frame if (detection_persistence > 0 and last_annotated_frame is not None) else frame
-        cv2.imshow("Fire Detector (YOLOv8)", display)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+        ret, frame = cap.retrieve()
+        if not ret:
+            log.info("End of video/stream.")
+            stream_ended = True
+        else:
+            # Crop out top and bottom portions of the frame; the row range only changes
+            # with the frame height, so it is recomputed only then
+            h = frame.shape[0]
+            if h != crop_height:
+                crop_height = h
+                if CROP_TOP_RATIO > 0:
+                    crop_top_pixels = int(h * CROP_TOP_RATIO)
+                else:
+                    crop_top_pixels = 0
+
+                if CROP_BOTTOM_RATIO > 0:
+                    crop_bottom_pixels = int(h * CROP_BOTTOM_RATIO)
+                else:
+                    crop_bottom_pixels = 0
+
+                if crop_top_pixels + crop_bottom_pixels < h:
+                    crop_rows = slice(crop_top_pixels, h - crop_bottom_pixels)
+                else:
+                    crop_rows = slice(None)
+
+            # A row slice is a view, so the crop itself copies nothing; the one pass over the
+            # pixels happens in the model's letterbox resize
+            pending_frames.append(frame[crop_rows])
+
+    # Run detection once a batch is full (or on whatever is left when the stream ends)
+    if not pending_frames or (len(pending_frames) < batch_size and not stream_ended):
         continue
+    batch_results = model(pending_frames, imgsz=INFERENCE_IMGSZ, conf=CONF_THRESHOLD, verbose=False)
+    pending_frames = []
 
-    # Run detection
-    results = model(frame, conf=CONF_THRESHOLD)
-    annotated = results[0].plot()
-
-    fire_detected = False
-    smoke_detected = False
-    detection_types = []
-
-    for box in results[0].boxes:
-        cls = int(box.cls[0])
-        conf = float(box.conf[0])
-        class_name = model.names[cls].lower()
-
-        if conf >= CONF_THRESHOLD and ('fire' in class_name or 'smoke' in class_name or 'flame' in class_name):
-            print(f"[DEBUG] Detected: {model.names[cls]} (confidence: {conf:.2f})")
-            
-            if 'smoke' in class_name:
-                smoke_detected = True
-                detection_types.append('smoke')
-            else:
-                fire_detected = True
-                detection_types.append('fire')
-
-    # Update state and persistence
-    if fire_detected or smoke_detected:
-        detection_persistence = PERSISTENCE_FRAMES
-        last_fire_detected = fire_detected
-        last_smoke_detected = smoke_detected
-        last_annotated_frame = annotated.copy()
-    elif detection_persistence > 0:
-        fire_detected = last_fire_detected
-        smoke_detected = last_smoke_detected
-    
-    # Encode frame for streaming
-    ok, buf = cv2.imencode('.jpg', annotated, [cv2.IMWRITE_JPEG_QUALITY, 80])
-    if ok:
-        with frame_lock:
-            latest_jpeg = buf.tobytes()
-            latest_stats = {
-                "fire": fire_detected,
-                "smoke": smoke_detected,
-                "detections": detection_types,
-                "timestamp": time.time(),
-            }
-
-    # Handle alarm
-    if fire_detected or smoke_detected:
-        if not alarm_playing:
-            if fire_detected:
-                print("[ALERT] FIRE DETECTED!")
-                cv2.putText(annotated, "FIRE DETECTED!", (10, 50),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
-            if smoke_detected:
-                print("[ALERT] SMOKE DETECTED!")
-                cv2.putText(annotated, "SMOKE DETECTED!", (10, 100),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1.5, (100, 100, 255), 3)
-            alarm.play()
-            alarm_playing = True
-    else:
-        alarm_playing = False
+    for result in batch_results:
+        # The hold-over counts grabbed frames; FRAME_SKIP of them lie between
+        # two detection frames, also within a batch
+        detection_persistence = max(detection_persistence - FRAME_SKIP, 0)
+        
+        boxes = result.boxes
+        class_ids = boxes.cls.cpu().numpy().astype(np.intp)
+        confs = boxes.conf.cpu().numpy()
+        kinds = CLASS_KIND[class_ids] * (confs >= CONF_THRESHOLD)
+        hits = kinds > 0
+
+        fire_detected = bool((kinds == FIRE).any())
+        smoke_detected = bool((kinds == SMOKE).any())
+        detection_types = ['smoke' if kind == SMOKE else 'fire' for kind in kinds[hits]]
 
-    cv2.imshow("Fire Detector (YOLOv8)", annotated)
+        if log.isEnabledFor(logging.DEBUG):
+            for cls, conf in zip(class_ids[hits], confs[hits]):
+                log.debug("Detected: %s (confidence: %.2f)", model.names[cls], conf)
+
+        # Without any boxes plot() would only copy the frame, so show the frame itself
+        annotated = result.plot() if len(class_ids) else result.orig_img
+
+        # Update state and persistence
+        if fire_detected or smoke_detected:
+            detection_persistence = PERSISTENCE_FRAMES
+            last_fire_detected = fire_detected
+            last_smoke_detected = smoke_detected
+        elif detection_persistence > 0:
+            fire_detected = last_fire_detected
+            smoke_detected = last_smoke_detected
+        
+        # Hand frame to the encoder thread for streaming
+        publish_frame(annotated, {
+            "fire": fire_detected,
+            "smoke": smoke_detected,
+            "detections": detection_types,
+            "timestamp": time.time(),
+        })
+
+        # Handle alarm
+        if fire_detected or smoke_detected:
+            if not alarm_playing:
+                # The streamed frame may still be encoding; draw the alert on a copy
+                annotated = annotated.copy()
+                if fire_detected:
+                    log.warning("FIRE DETECTED!")
+                    cv2.putText(annotated, "FIRE DETECTED!", (10, 50),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 255), 3)
+                if smoke_detected:
+                    log.warning("SMOKE DETECTED!")
+                    cv2.putText(annotated, "SMOKE DETECTED!", (10, 100),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1.5, (100, 100, 255), 3)
+                alarm.play()
+                alarm_playing = True
+        else:
+            alarm_playing = False
+
+        cv2.imshow("Fire Detector (YOLOv8)", annotated)
+        # Let the window draw every frame of a batch, not just the last one
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            quit_requested = True
+            break
+
+    if quit_requested:
+        break
 
 cap.release()
 cv2.destroyAllWindows()
+log_listener.stop()
@@ -0,0 +1,120 @@
+"""
+Quantize the exported ONNX fire detector to int8 for faster CPU inference.
+
+Calibrates on frames sampled evenly from a video (default: video.mp4 next to this
+script) and writes best_int8.onnx, which fire_webcam_alarm.py loads instead of
+best.onnx when no CUDA GPU is available. Only the convolutions are quantized; the
+box decoding in the detection head stays in float.
+
+Run fire_webcam_alarm.py once first so that best.onnx has been exported, then:
+    uv run fire-detection/quantize_model.py [--video path/to/clip.mp4]
+"""
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+import onnx
+import onnxruntime as ort
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_static,
+)
+
+BASE_DIR = Path(__file__).resolve().parent
+ONNX_MODEL_PATH = BASE_DIR / "best.onnx"
+INT8_MODEL_PATH = BASE_DIR / "best_int8.onnx"
+DEFAULT_VIDEO = BASE_DIR / "video.mp4"
+CALIBRATION_FRAMES = 64
+LETTERBOX_COLOR = 114
+
+
+def letterbox(frame, size):
+    """Resize a BGR frame into a size x size RGB float32 NCHW tensor the way Ultralytics does."""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    canvas = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    top = (size - new_h) // 2
+    left = (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    rgb = cv2.cvtColor(canvas, cv2.COLOR_BGR2RGB)
+    return np.ascontiguousarray(rgb.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def sample_frames(video_path, count):
+    """Read up to count frames spread evenly over the video."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise IOError(f"Could not open video file: {video_path}")
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    for index in np.linspace(0, max(total - 1, 0), num=count, dtype=int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ok, frame = cap.read()
+        if ok:
+            frames.append(frame)
+    cap.release()
+    if not frames:
+        raise IOError(f"No frames could be read from: {video_path}")
+    return frames
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """Feeds preprocessed video frames to the int8 calibrator one at a time."""
+
+    def __init__(self, frames, input_name, size):
+        self.inputs = iter([{input_name: letterbox(frame, size)} for frame in frames])
+
+    def get_next(self):
+        return next(self.inputs, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize best.onnx to int8 for CPU inference")
+    parser.add_argument("--video", type=Path, default=DEFAULT_VIDEO,
+                        help="Video with representative scenes used for calibration")
+    parser.add_argument("--frames", type=int, default=CALIBRATION_FRAMES,
+                        help="Number of calibration frames sampled from the video")
+    args = parser.parse_args()
+
+    if not ONNX_MODEL_PATH.exists():
+        print(f"[ERROR] {ONNX_MODEL_PATH} not found; run fire_webcam_alarm.py once to export it.")
+        exit(1)
+
+    model_input = ort.InferenceSession(
+        str(ONNX_MODEL_PATH), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0]
+    size = model_input.shape[-1]
+
+    print(f"[INFO] Sampling {args.frames} calibration frames from {args.video}...")
+    frames = sample_frames(args.video, args.frames)
+
+    print(f"[INFO] Quantizing {ONNX_MODEL_PATH.name} -> {INT8_MODEL_PATH.name}...")
+    quantize_static(
+        str(ONNX_MODEL_PATH),
+        str(INT8_MODEL_PATH),
+        FrameCalibrationReader(frames, model_input.name, size),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        op_types_to_quantize=["Conv"],
+    )
+
+    # Ultralytics reads class names, stride and image size from the model metadata
+    source = onnx.load(str(ONNX_MODEL_PATH), load_external_data=False)
+    quantized = onnx.load(str(INT8_MODEL_PATH))
+    del quantized.metadata_props[:]
+    quantized.metadata_props.extend(source.metadata_props)
+    onnx.save(quantized, str(INT8_MODEL_PATH))
+
+    print(f"[INFO] Saved {INT8_MODEL_PATH}")
+
+
+if __name__ == "__main__":
+    main()
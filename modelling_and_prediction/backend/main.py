@@ -4,21 +4,43 @@ Connects the React frontend to the XGBoost fire prediction model
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
+from starlette.datastructures import Headers
+from starlette.staticfiles import NotModifiedResponse
+import asyncio
+import hashlib
 import joblib
+import logging
+import logging.handlers
+import queue
+import math
+import mimetypes
+import numba
 import numpy as np
-import pandas as pd
+import orjson
 from sklearn.preprocessing import LabelEncoder
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 from pathlib import Path
 import os
-import time
 import sys
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
+import shapely
+from shapely.geometry import Point, mapping
+from modelling_and_prediction.frontend.maps.county_map_with_wind import (
+    TO_ALBERS, build_county_cache, intersection_areas, load_county_data,
+    load_worker_counties, render_map_file
+)
+
 # Path to model files
 BASE_DIR = Path(__file__).parent.parent
 NOTEBOOKS_DIR = BASE_DIR / "notebooks" / "models"
@@ -49,29 +71,102 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for generated maps
-app.mount("/maps", StaticFiles(directory=str(MAPS_DIR)), name="maps")
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that sends a file's precompressed .gz sibling to clients accepting gzip."""
+    
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        if "gzip" in request_headers.get("accept-encoding", ""):
+            gz_path = f"{full_path}.gz"
+            try:
+                gz_stat = os.stat(gz_path)
+            except FileNotFoundError:
+                gz_stat = None
+            if gz_stat is not None:
+                response = FileResponse(
+                    gz_path,
+                    status_code=status_code,
+                    stat_result=gz_stat,
+                    media_type=mimetypes.guess_type(str(full_path))[0],
+                    headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"},
+                )
+                if self.is_not_modified(response.headers, request_headers):
+                    return NotModifiedResponse(response.headers)
+                return response
+        return super().file_response(full_path, stat_result, scope, status_code)
+
+
+# Request logging: handlers only enqueue records and a listener thread (started with
+# the app) writes them out, so formatting and console I/O stay off the event loop
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+log_queue = queue.SimpleQueue()
+log.addHandler(logging.handlers.QueueHandler(log_queue))
+log_console = logging.StreamHandler()
+log_console.setFormatter(logging.Formatter("%(levelname)s:     %(message)s"))
+log_listener = logging.handlers.QueueListener(log_queue, log_console)
+
+# Mount static files for generated maps; maps are stored gzip-compressed next to the HTML
+app.mount("/maps", PrecompressedStaticFiles(directory=str(MAPS_DIR)), name="maps")
 
 # Global variables for models and encoders
 size_model = None  # Ensemble XGBoost for size prediction
+size_booster = None  # Underlying XGBoost Booster of size_model, for inplace prediction
+size_iteration_range = (0, 0)  # Trees used by size_model.predict (all, unless early-stopped)
 risk_model = None  # Risk classifier
 risk_metadata = None
 le_cause = None
 le_state = None
 le_season = None
+# Label -> code lookups built from the encoders' classes
+cause_ids = None
+state_ids = None
+season_ids = None
+
+# Micro-batching of size predictions: requests arriving within the window share one
+# inference call on the stacked feature rows
+PREDICT_BATCH_WINDOW_S = 0.002
+PREDICT_MAX_BATCH = 32
+predict_queue = None  # asyncio.Queue of (feature row, future) pairs
+
+# Full turn for the cyclical time features
+TWO_PI = 2 * math.pi
 
 # Global cache for county data (loaded once)
-county_gdf_cache = None
+county_gdf_cache = None  # County cache from build_county_cache
+
+# Recently generated fire maps, keyed on the rounded request parameters, least
+# recently used first; an evicted entry's HTML file is deleted
+FIRE_MAP_CACHE_SIZE = 256
+fire_map_cache = OrderedDict()  # key -> (total_pop, affected_counties, map_filename)
+fire_map_renders = {}  # key -> asyncio.Future of a map being generated
+
+# Worker processes generating fire maps; each keeps its own county cache
+MAP_WORKERS = 4
+map_pool = None  # ProcessPoolExecutor, created at startup
 
 
 def initialize_model():
     """Load models and create label encoders at startup"""
-    global size_model, risk_model, risk_metadata, le_cause, le_state, le_season
+    global size_model, size_booster, size_iteration_range, risk_model, risk_metadata
+    global le_cause, le_state, le_season, cause_ids, state_ids, season_ids
     
     try:
         print(f"Loading size prediction model from: {SIZE_MODEL_PATH}")
         size_model = joblib.load(SIZE_MODEL_PATH)
         
+        # Predict straight on the Booster: inplace_predict reads the float32 feature row
+        # without building a DMatrix or going through the sklearn wrapper
+        if hasattr(size_model, "get_booster"):
+            size_booster = size_model.get_booster()
+            try:
+                size_iteration_range = (0, size_model.best_iteration + 1)
+            except AttributeError:
+                size_iteration_range = (0, 0)
+        
         print(f"Loading risk classification model from: {RISK_MODEL_PATH}")
         risk_model = joblib.load(RISK_MODEL_PATH)
         
@@ -96,6 +191,15 @@ def initialize_model():
         le_season = LabelEncoder()
         le_season.classes_ = np.array(['Fall', 'Spring', 'Summer', 'Winter'])
         
+        # Plain dict lookups give the same codes as LabelEncoder.transform without
+        # the per-call array round trip
+        cause_ids = {label: code for code, label in enumerate(le_cause.classes_)}
+        state_ids = {label: code for code, label in enumerate(le_state.classes_)}
+        season_ids = {label: code for code, label in enumerate(le_season.classes_)}
+        
+        # Compile (or load the cached) feature kernel now rather than on the first request
+        _build_features(20.0, 30.0, 10.0, 20.0, 35.0, -100.0, 7, 190, 0, 0, 0, 0, 1)
+        
         # Create feature names list (35 features for ensemble model)
         risk_metadata = {
             'feature_names': [
@@ -126,10 +230,81 @@ def initialize_model():
         raise
 
 
+def predict_log_sizes(features: np.ndarray) -> np.ndarray:
+    """Predict log1p(acres) for each row of a stacked feature matrix"""
+    if size_booster is not None:
+        return size_booster.inplace_predict(features, iteration_range=size_iteration_range)
+    return size_model.predict(features)
+
+
+async def predict_batcher():
+    """Collect queued feature rows for a short window and predict them in one call"""
+    while True:
+        batch = [await predict_queue.get()]
+        await asyncio.sleep(PREDICT_BATCH_WINDOW_S)
+        while len(batch) < PREDICT_MAX_BATCH and not predict_queue.empty():
+            batch.append(predict_queue.get_nowait())
+        
+        features = np.vstack([row for row, _ in batch])
+        try:
+            # XGBoost releases the GIL, so the event loop keeps serving meanwhile
+            log_preds = await run_in_threadpool(predict_log_sizes, features)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        for (_, future), log_pred in zip(batch, log_preds):
+            if not future.done():
+                future.set_result(float(log_pred))
+
+
+async def predict_log_size(features: np.ndarray) -> float:
+    """Queue one feature row for the batcher and wait for its prediction"""
+    future = asyncio.get_running_loop().create_future()
+    predict_queue.put_nowait((features, future))
+    return await future
+
+
 # Initialize model at startup
 @app.on_event("startup")
 async def startup_event():
+    global predict_queue
+    log_listener.start()
     initialize_model()
+    predict_queue = asyncio.Queue()
+    # Keep a reference so the task is not garbage collected
+    app.state.predict_batcher = asyncio.create_task(predict_batcher())
+    # Warm the county cache so the first map/population request does not pay for it;
+    # a failure here is reported again by the endpoints that need the data
+    try:
+        load_county_data_cached()
+    except Exception:
+        pass
+    # Maps from a previous run are not in the (empty) map cache and would never be evicted
+    for stale_map in MAPS_DIR.glob("fire_map_*.html*"):
+        stale_map.unlink(missing_ok=True)
+    start_map_pool()
+
+
+def start_map_pool():
+    """Start the map worker processes and have each load the county data."""
+    global map_pool
+    
+    # spawn rather than fork: the parent already runs numba and other threads
+    map_pool = ProcessPoolExecutor(
+        max_workers=MAP_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    )
+    # Errors (e.g. missing data files) are reported by the map requests themselves
+    for _ in range(MAP_WORKERS):
+        map_pool.submit(load_worker_counties, str(COUNTIES_FILE), str(POPULATION_FILE))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if map_pool is not None:
+        map_pool.shutdown(wait=False, cancel_futures=True)
+    log_listener.stop()
 
 
 # Pydantic models for request/response
@@ -261,108 +436,107 @@ RECOMMENDATIONS = {
 }
 
 
-def prepare_features(request: PredictionRequest) -> pd.DataFrame:
-    """
-    Prepare feature vector for prediction
-    Must match EXACTLY the features and order used in training
-    """
-    temp_range = request.max_temp - request.min_temp
-    
-    # Encode categorical variables using TRAINED encoders
-    try:
-        cause_encoded = le_cause.transform([request.cause])[0]
-    except:
-        # If cause not in training set, use most common (Miscellaneous)
-        cause_encoded = le_cause.transform(['Miscellaneous'])[0]
-        
-    try:
-        state_encoded = le_state.transform([request.state.upper()])[0]
-    except:
-        raise HTTPException(status_code=400, detail=f"Invalid state code: {request.state}")
-    
-    try:
-        season_encoded = le_season.transform([request.season])[0]
-    except:
-        raise HTTPException(status_code=400, detail=f"Invalid season: {request.season}")
+@numba.njit(cache=True)
+def _build_features(mean_temp, max_temp, min_temp, discovery_temp, latitude, longitude,
+                    month, day_of_year, cause_encoded, state_encoded, season_encoded,
+                    num_cities, hot_season):
+    """Compute the (1, 35) float32 feature row; compiled, as it runs on every request"""
+    temp_range = max_temp - min_temp
     
     # Calculate lat/lon bins (same as training)
-    lat_bin = int((request.latitude - 20.0) / 30.0 * 10)
+    lat_bin = int((latitude - 20.0) / 30.0 * 10)
     lat_bin = max(0, min(9, lat_bin))
     
-    lon_bin = int((request.longitude + 125.0) / 60.0 * 10)
+    lon_bin = int((longitude + 125.0) / 60.0 * 10)
     lon_bin = max(0, min(9, lon_bin))
     
-    # Create feature dictionary in EXACT order from metadata
     # Order MUST match: metadata['feature_names']
-    features = {
-        # Temperature features
-        'mean_temp': request.mean_temp,
-        'max_temp': request.max_temp,
-        'min_temp': request.min_temp,
-        'temp_range': temp_range,
-        'discovery_temp': request.discovery_temp,
-        
-        # Temperature interactions
-        'temp_range_mean': temp_range * request.mean_temp,
-        'temp_range_max': temp_range * request.max_temp,
-        'mean_max_temp': request.mean_temp * request.max_temp,
-        'discovery_mean_temp': request.discovery_temp * request.mean_temp,
-        
-        # Temperature polynomials
-        'mean_temp_sq': request.mean_temp ** 2,
-        'max_temp_sq': request.max_temp ** 2,
-        'temp_range_sq': temp_range ** 2,
-        
-        # Location features
-        'LATITUDE': request.latitude,
-        'LONGITUDE': request.longitude,
-        'lat_bin': lat_bin,
-        'lon_bin': lon_bin,
-        
-        # Temporal features
-        'month': request.month,
-        'day_of_year': request.day_of_year,
-        
-        # Cyclical time features
-        'month_sin': np.sin(2 * np.pi * request.month / 12),
-        'month_cos': np.cos(2 * np.pi * request.month / 12),
-        'day_sin': np.sin(2 * np.pi * request.day_of_year / 365),
-        'day_cos': np.cos(2 * np.pi * request.day_of_year / 365),
-        
-        # Categorical encodings
-        'cause_encoded': cause_encoded,
-        'state_encoded': state_encoded,
-        'season_encoded': season_encoded,
-        
-        # Other features
-        'num_cities': request.num_cities,
-        
-        # ADVANCED FEATURES (for ensemble model - 9 additional features)
-        # Canadian Fire Weather Index (FWI) approximations
-        'ffmc_estimate': (request.mean_temp + 10) * 2.5,
-        'dmc_estimate': request.mean_temp * request.month * 0.8,
-        'dc_estimate': request.mean_temp ** 1.5,
-        
-        # Fire behavior proxies
-        'spread_rate_proxy': (request.max_temp / 10) * (temp_range + 1),
-        'intensity_proxy': request.mean_temp ** 2 / (abs(request.latitude) + 1),
-        'spread_potential': temp_range * request.mean_temp * 0.1,
-        
-        # Seasonal and regional risk factors
-        'season_severity': (1 if request.season in ['Summer', 'Fall'] else 0) * request.mean_temp,
-        'temp_anomaly': (request.mean_temp - 20.0) / 10.0,  # Normalized temp anomaly (assuming global mean ~20°C)
-        'high_risk_region': int((request.latitude >= 32) and (request.latitude <= 45) and 
-                                (request.longitude >= -125) and (request.longitude <= -100))
-    }
+    x = np.empty((1, 35), dtype=np.float32)
     
-    # Create DataFrame with features in the EXACT order from training
-    # First try ensemble model features (35 features), fallback to base features (26 features)
-    try:
-        features_df = pd.DataFrame([features])
-        return features_df
-    except Exception as e:
-        print(f"Warning: Could not create feature DataFrame: {e}")
-        raise
+    # Temperature features
+    x[0, 0] = mean_temp
+    x[0, 1] = max_temp
+    x[0, 2] = min_temp
+    x[0, 3] = temp_range
+    x[0, 4] = discovery_temp
+    
+    # Temperature interactions
+    x[0, 5] = temp_range * mean_temp                    # temp_range_mean
+    x[0, 6] = temp_range * max_temp                     # temp_range_max
+    x[0, 7] = mean_temp * max_temp                      # mean_max_temp
+    x[0, 8] = discovery_temp * mean_temp                # discovery_mean_temp
+    
+    # Temperature polynomials
+    x[0, 9] = mean_temp ** 2
+    x[0, 10] = max_temp ** 2
+    x[0, 11] = temp_range ** 2
+    
+    # Location features
+    x[0, 12] = latitude
+    x[0, 13] = longitude
+    x[0, 14] = lat_bin
+    x[0, 15] = lon_bin
+    
+    # Temporal features
+    x[0, 16] = month
+    x[0, 17] = day_of_year
+    
+    # Cyclical time features
+    x[0, 18] = math.sin(TWO_PI * month / 12)
+    x[0, 19] = math.cos(TWO_PI * month / 12)
+    x[0, 20] = math.sin(TWO_PI * day_of_year / 365)
+    x[0, 21] = math.cos(TWO_PI * day_of_year / 365)
+    
+    # Categorical encodings
+    x[0, 22] = cause_encoded
+    x[0, 23] = state_encoded
+    x[0, 24] = season_encoded
+    
+    # Other features
+    x[0, 25] = num_cities
+    
+    # ADVANCED FEATURES (for ensemble model - 9 additional features)
+    # Canadian Fire Weather Index (FWI) approximations
+    x[0, 26] = (mean_temp + 10) * 2.5                   # ffmc_estimate
+    x[0, 27] = mean_temp * month * 0.8                  # dmc_estimate
+    x[0, 28] = mean_temp ** 1.5                         # dc_estimate
+    
+    # Fire behavior proxies
+    x[0, 29] = (max_temp / 10) * (temp_range + 1)       # spread_rate_proxy
+    x[0, 30] = mean_temp ** 2 / (abs(latitude) + 1)     # intensity_proxy
+    x[0, 31] = temp_range * mean_temp * 0.1             # spread_potential
+    
+    # Seasonal and regional risk factors
+    x[0, 32] = hot_season * mean_temp                   # season_severity
+    x[0, 33] = (mean_temp - 20.0) / 10.0  # temp_anomaly: normalized (assuming global mean ~20°C)
+    x[0, 34] = int((latitude >= 32) and (latitude <= 45) and   # high_risk_region
+                   (longitude >= -125) and (longitude <= -100))
+    return x
+
+
+def prepare_features(request: PredictionRequest) -> np.ndarray:
+    """
+    Prepare feature vector for prediction as a (1, 35) float32 array
+    Must match EXACTLY the features and order used in training
+    """
+    # Encode categorical variables using TRAINED encoder classes
+    # If cause not in training set, use most common (Miscellaneous)
+    cause_encoded = cause_ids.get(request.cause, cause_ids['Miscellaneous'])
+    
+    state_encoded = state_ids.get(request.state.upper())
+    if state_encoded is None:
+        raise HTTPException(status_code=400, detail=f"Invalid state code: {request.state}")
+    
+    season_encoded = season_ids.get(request.season)
+    if season_encoded is None:
+        raise HTTPException(status_code=400, detail=f"Invalid season: {request.season}")
+    
+    return _build_features(
+        float(request.mean_temp), float(request.max_temp), float(request.min_temp),
+        float(request.discovery_temp), float(request.latitude), float(request.longitude),
+        request.month, request.day_of_year, cause_encoded, state_encoded, season_encoded,
+        request.num_cities, 1 if request.season in ['Summer', 'Fall'] else 0
+    )
 
 
 def calculate_risk_score(predicted_acres: float) -> float:
@@ -448,7 +622,7 @@ def health_check():
 
 
 @app.post("/predict", response_model=PredictionResponse, tags=["Prediction"])
-def predict_fire_size(request: PredictionRequest):
+async def predict_fire_size(request: PredictionRequest):
     """
     Predict wildfire size and risk level using two models:
     1. Ensemble XGBoost for size prediction
@@ -474,12 +648,12 @@ def predict_fire_size(request: PredictionRequest):
         print(f"   Cause: {request.cause}, Season: {request.season}")
         
         # Prepare features (includes all 35 features)
-        features_df_full = prepare_features(request)
-        print(f"   ✅ Features prepared: {features_df_full.shape}")
+        features = prepare_features(request)
+        print(f"   ✅ Features prepared: {features.shape}")
         
         # 1. SIZE PREDICTION using Ensemble XGBoost (needs all 35 features)
         print(f"\n📊 MODEL 1: Size Prediction (Ensemble XGBoost)")
-        log_pred = size_model.predict(features_df_full)[0]
+        log_pred = await predict_log_size(features)
         pred_acres = np.expm1(log_pred)
         pred_acres = float(pred_acres)
         print(f"   → Predicted size: {pred_acres:.1f} acres")
@@ -598,10 +772,12 @@ def predict_fire_size(request: PredictionRequest):
 
 
 @app.get("/api/population/{lat}/{lng}/{radius_km}")
-async def get_population_impact(lat: float, lng: float, radius_km: float):
+def get_population_impact(lat: float, lng: float, radius_km: float):
     """
     Get population impact within radius of fire location
-    Currently returns estimated data - will integrate with county data
+    
+    Counties are looked up in the cached spatial index and weighted by the
+    share of their area inside the circle.
     
     Parameters:
     - lat: Latitude of fire center
@@ -609,30 +785,62 @@ async def get_population_impact(lat: float, lng: float, radius_km: float):
     - radius_km: Radius in kilometers
     
     Returns GeoJSON with affected counties and population data
-    (Placeholder implementation - integrate your friend's GeoPandas logic here)
     """
     try:
-        # Placeholder: rough population density estimate
-        # TODO: Integrate with US_COUNTIES.csv and county_population_2023.csv
+        counties = load_county_data_cached()
+        gdf = counties["gdf"]
+        
+        center = Point(TO_ALBERS.transform(lng, lat))
+        circle = center.buffer(radius_km * 1000)
+        
+        # Only counties whose bounding boxes hit the circle are intersected
+        hit_idx = counties["tree"].query(circle, predicate="intersects")
+        county_area = counties["area"][hit_idx]
+        # A county whose bounding box corners are all in the circle lies inside it
+        minx, miny = counties["minx"][hit_idx], counties["miny"][hit_idx]
+        maxx, maxy = counties["maxx"][hit_idx], counties["maxy"][hit_idx]
+        covered = shapely.contains_xy(
+            circle,
+            np.concatenate((minx, minx, maxx, maxx)),
+            np.concatenate((miny, maxy, miny, maxy)),
+        ).reshape(4, -1).all(axis=0)
+        inside_area = county_area.copy()
+        inside_area[~covered] = intersection_areas(counties, hit_idx[~covered], circle)
+        fraction = np.divide(inside_area, county_area, out=np.zeros_like(county_area),
+                             where=county_area > 0)
+        population = counties["population"][hit_idx]
+        contribution = population * fraction
+        
+        features = []
+        for i in np.argsort(-contribution, kind="stable"):
+            row = hit_idx[i]
+            features.append({
+                "type": "Feature",
+                "geometry": mapping(gdf.geometry.iloc[row]),
+                "properties": {
+                    "name": str(gdf["COUNTY"].iloc[row]),
+                    "state": str(gdf["STATE"].iloc[row]),
+                    "population": int(population[i]),
+                    "affected_fraction": round(float(fraction[i]), 4),
+                    "contribution": int(contribution[i]),
+                },
+            })
+        
         area_sq_km = np.pi * radius_km * radius_km
-        avg_density = 100  # people per sq km (placeholder)
-        estimated_population = int(area_sq_km * avg_density)
         
-        return {
+        # County polygons make this payload large; orjson writes it straight to bytes
+        return Response(orjson.dumps({
             "type": "FeatureCollection",
             "properties": {
                 "center": {"lat": lat, "lng": lng},
                 "radius_km": radius_km,
-                "estimated_population": estimated_population,
+                "estimated_population": int(contribution.sum()),
                 "area_sq_km": round(area_sq_km, 2)
             },
-            "features": [
-                # TODO: Add actual county GeoJSON features here
-                # Each feature should have:
-                # - geometry: county polygon
-                # - properties: {name, state, population, affected_fraction, contribution}
-            ]
-        }
+            "features": features
+        }), media_type="application/json")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=f"Required data files not found: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Population calculation error: {str(e)}")
 
@@ -649,17 +857,83 @@ def load_county_data_cached():
         return county_gdf_cache
     
     try:
-        # Import the map generation module
-        from modelling_and_prediction.frontend.maps.county_map_with_wind import load_county_data
-        
-        county_gdf_cache = load_county_data(str(COUNTIES_FILE), str(POPULATION_FILE))
-        print(f"✅ County data loaded: {len(county_gdf_cache)} counties")
+        gdf = load_county_data(str(COUNTIES_FILE), str(POPULATION_FILE))
+        county_gdf_cache = build_county_cache(gdf, str(COUNTIES_FILE))
+        print(f"✅ County data loaded: {len(gdf)} counties")
         return county_gdf_cache
     except Exception as e:
         print(f"❌ Error loading county data: {e}")
         raise
 
 
+async def render_fire_map(request: FireMapRequest, key: tuple) -> tuple:
+    """
+    Generate the fire map HTML for a request in the map process pool and cache it.
+    
+    Returns:
+        The new fire_map_cache entry (total_pop, affected_counties, map_filename)
+    """
+    # The file name is derived from the parameters, so a URL always
+    # refers to the same map and browsers may cache it
+    map_filename = f"fire_map_{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}.html"
+    
+    log.info("🔥 Generating fire map: lat=%s, lon=%s, radius=%skm, wind=%smph @ %s°",
+             request.latitude, request.longitude, request.radius_km,
+             request.wind_speed_mph, request.wind_direction_deg)
+    
+    # Map generation is pure CPU work; running it in a worker process keeps the
+    # event loop free and lets several maps be generated at once
+    pool = map_pool
+    try:
+        total_pop, top = await asyncio.get_running_loop().run_in_executor(
+            pool,
+            render_map_file,
+            str(COUNTIES_FILE),
+            str(POPULATION_FILE),
+            request.latitude,
+            request.longitude,
+            request.radius_km,
+            request.wind_speed_mph,
+            request.wind_direction_deg,
+            str(MAPS_DIR / map_filename),
+        )
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; replace it for later requests
+        if map_pool is pool:
+            start_map_pool()
+        raise
+    
+    # Extract affected counties info (top 15)
+    affected_counties = []
+    if not top.empty:
+        counties_col = top["COUNTY"].to_numpy()
+        states_col = top["STATE"].to_numpy()
+        population_col = top["population"].to_numpy()
+        fraction_col = top["fraction"].to_numpy()
+        contrib_col = top["population_contrib"].to_numpy()
+        # Plain dicts in the AffectedCounty layout, serialized as-is by orjson
+        affected_counties = [
+            {
+                "county": str(counties_col[i]),
+                "state": str(states_col[i]),
+                "population": int(population_col[i]),
+                "affected_share": round(float(fraction_col[i]) * 100, 1),
+                "contributing_pop": int(contrib_col[i]),
+            }
+            for i in range(len(top))
+        ]
+    
+    log.info("✅ Map generated: %s, affected population: %d", map_filename, total_pop)
+    
+    entry = (total_pop, affected_counties, map_filename)
+    fire_map_cache[key] = entry
+    if len(fire_map_cache) > FIRE_MAP_CACHE_SIZE:
+        _, (_, _, evicted_filename) = fire_map_cache.popitem(last=False)
+        (MAPS_DIR / evicted_filename).unlink(missing_ok=True)
+        (MAPS_DIR / f"{evicted_filename}.gz").unlink(missing_ok=True)
+    return entry
+
+
 @app.post("/api/generate-fire-map", response_model=FireMapResponse, tags=["Fire Map"])
 async def generate_fire_map(request: FireMapRequest):
     """
@@ -674,59 +948,38 @@ async def generate_fire_map(request: FireMapRequest):
     Returns URL to generated map and population statistics.
     """
     try:
-        # Import map generation functions
-        from modelling_and_prediction.frontend.maps.county_map_with_wind import (
-            population_map, save_map_with_wind
-        )
-        
-        # Load county data (cached)
-        gdf = load_county_data_cached()
-        
-        # Fixed filename - overwrites previous map
-        map_filename = "fire_map.html"
-        output_path = MAPS_DIR / map_filename
-        
-        print(f"🔥 Generating fire map: lat={request.latitude}, lon={request.longitude}, "
-              f"radius={request.radius_km}km, wind={request.wind_speed_mph}mph @ {request.wind_direction_deg}°")
-        
-        # Generate the map
-        total_pop, table, m, wind_data = population_map(
-            gdf,
-            request.latitude,
-            request.longitude,
-            request.radius_km,
-            request.wind_speed_mph,
-            request.wind_direction_deg
-        )
-        
-        # Save map with wind and fire animations
-        save_map_with_wind(m, wind_data, str(output_path))
-        
-        # Extract affected counties info
-        affected_counties = []
-        if not table.empty:
-            for _, row in table.head(15).iterrows():  # Top 15 affected counties
-                affected_counties.append(AffectedCounty(
-                    county=str(row.get("COUNTY", "Unknown")),
-                    state=str(row.get("STATE", "Unknown")),
-                    population=int(row.get("population", 0)),
-                    affected_share=round(float(row.get("fraction", 0)) * 100, 1),
-                    contributing_pop=int(row.get("population_contrib", 0))
-                ))
-        
-        print(f"✅ Map generated: {map_filename}, affected population: {int(total_pop):,}")
-        
-        # Cache-busting timestamp to force browser refresh
-        cache_buster = int(time.time() * 1000)
-        
-        return FireMapResponse(
-            map_url=f"/maps/{map_filename}?t={cache_buster}",
-            total_population=int(total_pop),
-            affected_counties=affected_counties,
-            radius_km=request.radius_km,
-            center_lat=request.latitude,
-            center_lon=request.longitude
+        # Repeated requests (up to rounding) reuse the map already on disk
+        key = (
+            round(request.latitude, 4),
+            round(request.longitude, 4),
+            round(request.radius_km, 4),
+            round(request.wind_speed_mph, 4),
+            round(request.wind_direction_deg, 4),
         )
+        cached = fire_map_cache.get(key)
+        if cached is not None and (MAPS_DIR / cached[2]).exists():
+            fire_map_cache.move_to_end(key)
+        else:
+            # Identical requests arriving while the map is generated share one render
+            # (and do not write the same file concurrently)
+            render = fire_map_renders.get(key)
+            if render is None:
+                render = asyncio.ensure_future(render_fire_map(request, key))
+                fire_map_renders[key] = render
+                render.add_done_callback(lambda _: fire_map_renders.pop(key, None))
+            cached = await asyncio.shield(render)
+        total_pop, affected_counties, map_filename = cached
+        
+        # Serialized directly with orjson; response_model still documents the
+        # FireMapResponse schema, but FastAPI skips re-validating the payload
+        return Response(orjson.dumps({
+            "map_url": f"/maps/{map_filename}",
+            "total_population": int(total_pop),
+            "affected_counties": affected_counties,
+            "radius_km": request.radius_km,
+            "center_lat": request.latitude,
+            "center_lon": request.longitude,
+        }), media_type="application/json")
         
     except FileNotFoundError as e:
         raise HTTPException(
@@ -734,7 +987,7 @@ async def generate_fire_map(request: FireMapRequest):
             detail=f"Required data files not found: {str(e)}"
         )
     except Exception as e:
-        print(f"❌ Fire map generation error: {e}")
+        log.error("❌ Fire map generation error: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Fire map generation failed: {str(e)}"
@@ -743,9 +996,15 @@ async def generate_fire_map(request: FireMapRequest):
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop and httptools replace the pure-Python event loop and HTTP parser;
+    # uvloop does not support Windows. A single worker process is kept on
+    # purpose: the fire map cache and its files are owned by one process, and
+    # map generation already runs in the map process pool.
     uvicorn.run(
         app,
         host="0.0.0.0",
         port=int(os.getenv("PORT", 8000)),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -1,9 +1,10 @@
 # Maps Package - Fire map generation with wind animation
 from .county_map_with_wind import (
+    build_county_cache,
     load_county_data,
     population_map,
     save_map_with_wind,
 )
 
-__all__ = ['load_county_data', 'population_map', 'save_map_with_wind']
+__all__ = ['build_county_cache', 'load_county_data', 'population_map', 'save_map_with_wind']
 
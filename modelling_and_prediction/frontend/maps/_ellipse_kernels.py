@@ -0,0 +1,140 @@
+"""
+Numba kernels for the fire-spread ellipse.
+
+Kept separate from county_map_with_wind so the compiled code can be cached on
+disk (cache=True) and loaded by every worker without recompiling.
+"""
+import math
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True)
+def points_in_ellipse(px, py, x0, y0, a, b, theta):
+    """
+    Test which points lie inside an ellipse.
+
+    Args:
+        px, py: Point coordinates (float32 or float64 arrays of equal length)
+        x0, y0: Ellipse center
+        a: Semi-axis along the rotated x-axis
+        b: Semi-axis perpendicular to it
+        theta: Rotation of the a-axis from +x, in radians
+
+    Returns:
+        Boolean array, True where the point is inside or on the ellipse
+    """
+    cos_t = math.cos(theta)
+    sin_t = math.sin(theta)
+    inv_a2 = 1.0 / (a * a)
+    inv_b2 = 1.0 / (b * b)
+    out = np.empty(px.size, np.bool_)
+    for i in range(px.size):
+        dx = px[i] - x0
+        dy = py[i] - y0
+        xr = dx * cos_t + dy * sin_t
+        yr = -dx * sin_t + dy * cos_t
+        out[i] = xr * xr * inv_a2 + yr * yr * inv_b2 <= 1.0
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _clipped_ring_area(xs, ys, clip_x, clip_y):
+    """
+    Area of one ring clipped to a convex counter-clockwise polygon.
+
+    Sutherland-Hodgman: the ring is cut by each clip edge's half-plane in turn.
+    Clipping a concave ring can leave zero-width slivers, which do not change
+    the shoelace area.
+    """
+    cur_x = xs
+    cur_y = ys
+    m = xs.size
+    n_clip = clip_x.size
+    for k in range(n_clip):
+        if m == 0:
+            return 0.0
+        ax = clip_x[k]
+        ay = clip_y[k]
+        ex = clip_x[(k + 1) % n_clip] - ax
+        ey = clip_y[(k + 1) % n_clip] - ay
+        out_x = np.empty(2 * m)
+        out_y = np.empty(2 * m)
+        count = 0
+        px = cur_x[m - 1]
+        py = cur_y[m - 1]
+        p_side = ex * (py - ay) - ey * (px - ax)
+        for i in range(m):
+            qx = cur_x[i]
+            qy = cur_y[i]
+            q_side = ex * (qy - ay) - ey * (qx - ax)
+            if (q_side >= 0.0) != (p_side >= 0.0):
+                t = p_side / (p_side - q_side)
+                out_x[count] = px + t * (qx - px)
+                out_y[count] = py + t * (qy - py)
+                count += 1
+            if q_side >= 0.0:
+                out_x[count] = qx
+                out_y[count] = qy
+                count += 1
+            px = qx
+            py = qy
+            p_side = q_side
+        cur_x = out_x
+        cur_y = out_y
+        m = count
+
+    area = 0.0
+    for i in range(m):
+        j = (i + 1) % m
+        area += cur_x[i] * cur_y[j] - cur_x[j] * cur_y[i]
+    return abs(area) * 0.5
+
+
+@njit(cache=True, nogil=True)
+def clipped_polygon_areas(xs, ys, ring_offsets, part_offsets, geom_offsets, geom_idx,
+                          clip_x, clip_y):
+    """
+    Area of each selected (multi)polygon inside a convex clip polygon.
+
+    The polygons are given as the ragged buffers of shapely.to_ragged_array
+    (MultiPolygon layout): vertex coordinates xs/ys, then ring, part and
+    geometry offsets. The first ring of every part is its exterior, the rest
+    are holes.
+
+    Args:
+        xs, ys: Vertex coordinates (rings closed)
+        ring_offsets, part_offsets, geom_offsets: Ragged array offsets
+        geom_idx: Indices of the geometries to clip
+        clip_x, clip_y: Convex clip polygon, counter-clockwise, not closed
+
+    Returns:
+        Float64 array of clipped areas, one per entry of geom_idx
+    """
+    out = np.zeros(geom_idx.size)
+    for j in range(geom_idx.size):
+        g = geom_idx[j]
+        total = 0.0
+        for p in range(geom_offsets[g], geom_offsets[g + 1]):
+            for r in range(part_offsets[p], part_offsets[p + 1]):
+                start = ring_offsets[r]
+                end = ring_offsets[r + 1] - 1  # drop the closing vertex
+                area = _clipped_ring_area(xs[start:end], ys[start:end], clip_x, clip_y)
+                if r == part_offsets[p]:
+                    total += area
+                else:
+                    total -= area
+        out[j] = total
+    return out
+
+
+# Compile (or load from the on-disk cache) at import, not on the first request
+points_in_ellipse(np.zeros(1), np.zeros(1), 0.0, 0.0, 1.0, 1.0, 0.0)
+points_in_ellipse(np.zeros(1, np.float32), np.zeros(1, np.float32), 0.0, 0.0, 1.0, 1.0, 0.0)
+_offsets = np.array([0, 1], dtype=np.int64)
+clipped_polygon_areas(
+    np.array([0.0, 1.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0, 0.0]),
+    np.array([0, 4], dtype=np.int64), _offsets, _offsets, np.zeros(1, dtype=np.int64),
+    np.array([0.0, 2.0, 0.0]), np.array([0.0, 0.0, 2.0]),
+)
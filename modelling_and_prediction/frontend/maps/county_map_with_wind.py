@@ -1,13 +1,22 @@
 import pandas as pd
 import geopandas as gpd
-from shapely import wkt
-from shapely.geometry import Point, Polygon
+import shapely
+from shapely.geometry import Polygon
 import folium
+import base64
 import math
+import gzip
 import json
 import numpy as np
+import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from pyproj import Transformer
+
+from ._ellipse_kernels import clipped_polygon_areas, points_in_ellipse
 
 # ---------------------------------------------------------
 # CONSTANTS
@@ -15,6 +24,10 @@ from pathlib import Path
 CRS_WGS84 = "EPSG:4326"
 CRS_ALBERS = "EPSG:5070"  # Albers Equal Area Conic (for USA)
 
+# Created once: building a transformer costs far more than projecting a point
+TO_ALBERS = Transformer.from_crs(CRS_WGS84, CRS_ALBERS, always_xy=True)
+TO_WGS84 = Transformer.from_crs(CRS_ALBERS, CRS_WGS84, always_xy=True)
+
 # File paths
 COUNTIES_FILE = "modelling_and_prediction/data/processed/US_COUNTIES.csv"
 POPULATION_FILE = "modelling_and_prediction/data/processed/county_population_2023.csv"
@@ -35,11 +48,20 @@ ELLIPSE_NUM_POINTS = 64
 ELLIPSE_SHIFT_FACTOR = 0.25  # Shift 25% of base radius in wind direction
 ELLIPSE_LATERAL_FACTOR = 0.9  # Slightly narrower perpendicular to wind
 
+# Decimal places of the lat/lon written into the map HTML (~1 m)
+COORD_DECIMALS = 5
+
 # Wind animation parameters
 WIND_GRID_SIZE = 30
 WIND_GRID_SPAN = 10
 PARTICLE_COUNT = 1400  # Moderate number of arrows
 PARTICLE_MAX_AGE = 120
+WIND_MAX_FPS = 30  # Arrows are redrawn at most this often
+
+# County/ellipse intersections are split across this many threads; the
+# clipping kernel releases the GIL, so the chunks run on separate cores
+INTERSECTION_WORKERS = os.cpu_count() or 1
+_intersection_pool = ThreadPoolExecutor(max_workers=INTERSECTION_WORKERS)
 
 
 # ---------------------------------------------------------
@@ -49,6 +71,10 @@ def load_county_data(counties_file: str, population_file: str) -> gpd.GeoDataFra
     """
     Load county polygons and population data.
     
+    Parsing the WKT borders dominates loading, so the parsed counties are
+    kept as GeoParquet next to the CSV (same name, .parquet suffix) and read
+    from there while it is newer than the CSV.
+    
     Args:
         counties_file: Path to counties CSV file
         population_file: Path to population CSV file
@@ -65,21 +91,41 @@ def load_county_data(counties_file: str, population_file: str) -> gpd.GeoDataFra
     if not Path(population_file).exists():
         raise FileNotFoundError(f"Population file not found: {population_file}")
     
-    try:
-        counties = pd.read_csv(counties_file)
-    except Exception as e:
-        raise ValueError(f"Error loading counties file: {e}")
+    # The counties stay a plain DataFrame (geometry as an ordinary column)
+    # while filtering and joining; only the result becomes a GeoDataFrame
+    parsed_file = Path(counties_file).with_suffix(".parquet")
+    counties = None
+    if parsed_file.exists() and parsed_file.stat().st_mtime >= Path(counties_file).stat().st_mtime:
+        try:
+            counties = pd.DataFrame(gpd.read_parquet(parsed_file))
+        except Exception as e:
+            print(f"Warning: ignoring unreadable {parsed_file}: {e}")
     
-    try:
-        counties["geometry"] = counties["BORDERS"].apply(wkt.loads)
-    except Exception as e:
-        raise ValueError(f"Error parsing geometries: {e}")
-    
-    gdf = gpd.GeoDataFrame(counties, geometry="geometry", crs=CRS_WGS84)
-    
-    # Remove territories
-    gdf = gdf[~gdf["STATE"].isin(TERRITORIES_TO_REMOVE)]
-    gdf["GEOID"] = gdf["GEOID"].astype(str).str.zfill(5)
+    if counties is None:
+        try:
+            counties = pd.read_csv(counties_file)
+        except Exception as e:
+            raise ValueError(f"Error loading counties file: {e}")
+        
+        try:
+            counties["geometry"] = shapely.from_wkt(counties["BORDERS"].to_numpy())
+        except Exception as e:
+            raise ValueError(f"Error parsing geometries: {e}")
+        
+        # The WKT text is not needed once parsed
+        counties = counties.drop(columns="BORDERS")
+        
+        # Remove territories; with STATE categorical only the distinct state
+        # names are compared, the rows are filtered on their integer codes
+        counties["STATE"] = counties["STATE"].astype("category")
+        territory_codes = np.flatnonzero(counties["STATE"].cat.categories.isin(TERRITORIES_TO_REMOVE))
+        counties = counties[~np.isin(counties["STATE"].cat.codes.to_numpy(), territory_codes)].copy()
+        counties["GEOID"] = pd.to_numeric(counties["GEOID"], errors="coerce").astype("Int64")
+        
+        try:
+            gpd.GeoDataFrame(counties, geometry="geometry", crs=CRS_WGS84).to_parquet(parsed_file)
+        except OSError as e:
+            print(f"Warning: could not write {parsed_file}: {e}")
     
     # Load population
     try:
@@ -88,12 +134,102 @@ def load_county_data(counties_file: str, population_file: str) -> gpd.GeoDataFra
         raise ValueError(f"Error loading population file: {e}")
     
     pop = pop.rename(columns={"POP_ESTIMATE_2023": "population"})
-    pop["GEOID"] = pop["GEOID"].astype(str).str.zfill(5)
     
-    gdf = gdf.merge(pop[["GEOID", "population"]], on="GEOID", how="left")
-    gdf["population"] = gdf["population"].fillna(0)
+    # GEOIDs are FIPS codes: join them as integers and format the
+    # 5-digit string once afterwards
+    pop["GEOID"] = pd.to_numeric(pop["GEOID"], errors="coerce").astype("Int64")
+    counties["GEOID"] = pd.to_numeric(counties["GEOID"], errors="coerce").astype("Int64")
+    counties = counties.merge(pop[["GEOID", "population"]], on="GEOID", how="left")
+    counties["population"] = counties["population"].fillna(0)
+    counties["GEOID"] = counties["GEOID"].astype(object).map("{:05d}".format, na_action="ignore")
     
-    return gdf
+    return gpd.GeoDataFrame(counties, geometry="geometry", crs=CRS_WGS84)
+
+
+def build_county_cache(gdf: gpd.GeoDataFrame, counties_file: str = None) -> dict:
+    """
+    Precompute the per-county data population_map works on.
+    
+    Projecting every county polygon to Albers is the most expensive part of a
+    map request, so it is done once here, together with the spatial index
+    (STRtree) used to find the counties a fire ellipse touches, flat arrays
+    of the projected bounding boxes and the projected polygons as ragged
+    coordinate buffers for the compiled clipping kernel.
+    
+    With counties_file given, the projected polygons are also kept as
+    GeoParquet next to it (_albers.parquet suffix) and read from there while
+    it is newer than the CSV, so restarted workers skip the projection. The
+    STRtree itself cannot be stored; it is rebuilt from the bounding boxes.
+    
+    Args:
+        gdf: GeoDataFrame from load_county_data
+        counties_file: Counties CSV gdf was loaded from (optional)
+        
+    Returns:
+        Dict with the original counties ("gdf"), their Albers projection
+        ("gdf_proj"), its spatial index ("tree"), bounding box arrays
+        ("minx", "miny", "maxx", "maxy", float32 rounded outward), projected
+        areas ("area"), populations ("population", int32) and ragged polygon buffers
+        ("xs", "ys", "ring_offsets", "part_offsets", "geom_offsets")
+    """
+    gdf_proj = None
+    projected_file = None
+    if counties_file is not None:
+        projected_file = Path(counties_file).with_name(Path(counties_file).stem + "_albers.parquet")
+        if (projected_file.exists()
+                and projected_file.stat().st_mtime >= Path(counties_file).stat().st_mtime):
+            try:
+                projected = gpd.read_parquet(projected_file)
+                # Only usable if it holds the same counties in the same order
+                if projected["GEOID"].tolist() == gdf["GEOID"].tolist():
+                    gdf_proj = gdf.set_geometry(projected.geometry.values)
+            except Exception as e:
+                print(f"Warning: ignoring unreadable {projected_file}: {e}")
+    
+    if gdf_proj is None:
+        gdf_proj = gdf.to_crs(CRS_ALBERS)
+        if projected_file is not None:
+            try:
+                gdf_proj[["GEOID", "geometry"]].to_parquet(projected_file)
+            except OSError as e:
+                print(f"Warning: could not write {projected_file}: {e}")
+    
+    bounds = gdf_proj.geometry.bounds
+    _, coords, offsets = shapely.to_ragged_array(gdf_proj.geometry.to_numpy())
+    if len(offsets) == 3:
+        ring_offsets, part_offsets, geom_offsets = offsets
+    else:
+        # Only plain Polygons: every geometry is a single part
+        ring_offsets, part_offsets = offsets
+        geom_offsets = np.arange(len(gdf_proj) + 1)
+    
+    return {
+        "gdf": gdf,
+        "gdf_proj": gdf_proj,
+        # Accessing sindex builds the tree now rather than on the first query
+        "tree": gdf_proj.sindex,
+        # Single precision halves the data the covered-county tests scan;
+        # rounding outward keeps every box around its county
+        "minx": _to_float32(bounds["minx"].to_numpy(), -np.inf),
+        "miny": _to_float32(bounds["miny"].to_numpy(), -np.inf),
+        "maxx": _to_float32(bounds["maxx"].to_numpy(), np.inf),
+        "maxy": _to_float32(bounds["maxy"].to_numpy(), np.inf),
+        "area": shapely.area(gdf_proj.geometry.to_numpy()),
+        "population": gdf["population"].to_numpy(np.int32),
+        "xs": np.ascontiguousarray(coords[:, 0]),
+        "ys": np.ascontiguousarray(coords[:, 1]),
+        "ring_offsets": ring_offsets.astype(np.int64),
+        "part_offsets": part_offsets.astype(np.int64),
+        "geom_offsets": geom_offsets.astype(np.int64),
+    }
+
+
+def _to_float32(values: np.ndarray, direction: float) -> np.ndarray:
+    """Round float64 values to float32 toward direction (-inf or +inf)."""
+    rounded = values.astype(np.float32)
+    past = rounded > values if direction < 0 else rounded < values
+    rounded[past] = np.nextafter(rounded[past], np.float32(direction))
+    return rounded
 
 
 # ---------------------------------------------------------
@@ -116,6 +252,18 @@ def color_from_heat(h: float) -> str:
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
+# The 256 colors color_from_heat can return, indexed by their green/blue level
+_HEAT_COLORS = np.array([f"#ff{level:02x}{level:02x}" for level in range(256)])
+
+
+def colors_from_heat(heat: np.ndarray) -> np.ndarray:
+    """
+    Vectorized color_from_heat: hex colors for an array of heat values.
+    """
+    heat = np.clip(np.asarray(heat, dtype=float), 0, 1)
+    return _HEAT_COLORS[(255 * (1 - heat)).astype(int)]
+
+
 # ---------------------------------------------------------
 # 3. Generate wind field for canvas animation
 # ---------------------------------------------------------
@@ -135,7 +283,7 @@ def generate_wind_field(speed_mph: float, direction_deg: float,
         span: Geographic extent of grid
         
     Returns:
-        Tuple (u, v, lat, lon) - Wind components and grid coordinates
+        Tuple (u, v, lat, lon) - Wind component arrays (size x size) and grid coordinates
     """
     rad = math.radians(direction_deg)
 
@@ -143,11 +291,12 @@ def generate_wind_field(speed_mph: float, direction_deg: float,
     u_base = -speed_mph * math.sin(rad)
     v_base = -speed_mph * math.cos(rad)
 
-    lat = [center_lat + span * (i - size/2) / size for i in range(size)]
-    lon = [center_lon + span * (j - size/2) / size for j in range(size)]
+    steps = span * (np.arange(size) - size/2) / size
+    lat = (center_lat + steps).tolist()
+    lon = (center_lon + steps).tolist()
 
-    u = [[u_base for _ in range(size)] for _ in range(size)]
-    v = [[v_base for _ in range(size)] for _ in range(size)]
+    u = np.full((size, size), u_base)
+    v = np.full((size, size), v_base)
 
     return u, v, lat, lon
 
@@ -156,7 +305,8 @@ def generate_wind_field(speed_mph: float, direction_deg: float,
 # 4. Create ellipse (for fire spread based on wind)
 # ---------------------------------------------------------
 def create_wind_ellipse(lat: float, lon: float, radius_km: float, 
-                        wind_speed_mph: float, wind_direction_deg: float) -> Polygon:
+                        wind_speed_mph: float, wind_direction_deg: float,
+                        verbose: bool = False) -> Polygon:
     """
     Create an ellipse for fire spread based on wind.
     
@@ -167,14 +317,56 @@ def create_wind_ellipse(lat: float, lon: float, radius_km: float,
     
     East wind (90°): Wind blows westward → Ellipse points west (left)
     North wind (0°): Wind blows southward → Ellipse points south (down)
+    
+    With verbose=True the wind direction and ellipse axes are printed.
+    """
+    center_x, center_y = wind_ellipse_params(
+        lat, lon, radius_km, wind_speed_mph, wind_direction_deg, verbose
+    )[:2]
+    *_, ring_x, ring_y = _wind_structs(radius_km, wind_speed_mph, wind_direction_deg)
+    return shapely.polygons(np.column_stack((center_x + ring_x, center_y + ring_y)))
+
+
+def wind_ellipse_params(lat: float, lon: float, radius_km: float, 
+                        wind_speed_mph: float, wind_direction_deg: float,
+                        verbose: bool = False) -> tuple:
+    """
+    Compute the fire-spread ellipse described in create_wind_ellipse.
+    
+    Returns:
+        Tuple (center_x, center_y, a, b, dx, dy) in EPSG:5070 metres: ellipse
+        center, major/minor semi-axes and the unit wind direction (major axis)
     """
     # Project for precise calculation
-    point = Point(lon, lat)
-    gdf_point = gpd.GeoDataFrame([1], geometry=[point], crs=CRS_WGS84)
-    gdf_proj = gdf_point.to_crs(CRS_ALBERS)
-    center_x = gdf_proj.geometry.iloc[0].x
-    center_y = gdf_proj.geometry.iloc[0].y
+    center_x, center_y = TO_ALBERS.transform(lon, lat)
     
+    a, b, dx, dy, shift_x, shift_y, _, _ = _wind_structs(
+        radius_km, wind_speed_mph, wind_direction_deg
+    )
+    
+    if verbose:
+        print(f"  Wind from {wind_direction_deg}° → blows to {(wind_direction_deg + 180) % 360}°")
+        print(f"  Direction: dx={dx:.2f}, dy={dy:.2f}")
+        print(f"  Ellipse: a={a/1000:.1f}km, b={b/1000:.1f}km, shift={(a - b) * 0.5 / 1000:.1f}km")
+    
+    return center_x + shift_x, center_y + shift_y, a, b, dx, dy
+
+
+@lru_cache(maxsize=4096)
+def _wind_structs(radius_km: float, wind_speed_mph: float, wind_direction_deg: float) -> tuple:
+    """
+    Position-independent part of the fire-spread ellipse.
+    
+    In EPSG:5070 the ellipse only depends on the fire origin through a
+    translation, so its shape is computed once per (radius, wind) combination
+    and shifted to each origin.
+    
+    Returns:
+        Tuple (a, b, dx, dy, shift_x, shift_y, ring_x, ring_y): semi-axes, unit
+        wind direction, offset of the ellipse center from the fire origin and
+        the ELLIPSE_NUM_POINTS vertex offsets from the ellipse center
+        (read-only arrays)
+    """
     # Base radius in meters
     radius_m = radius_km * 1000
     
@@ -214,35 +406,66 @@ def create_wind_ellipse(lat: float, lon: float, radius_km: float,
     
     # Shift: Fire origin should be at the BACK edge of ellipse
     shift_to_wind = (a - b) * 0.5
-    ellipse_center_x = center_x + shift_to_wind * dx
-    ellipse_center_y = center_y + shift_to_wind * dy
     
-    print(f"  Wind from {wind_direction_deg}° → blows to {wind_to_deg}°")
-    print(f"  Direction: dx={dx:.2f}, dy={dy:.2f}")
-    print(f"  Ellipse: a={a/1000:.1f}km, b={b/1000:.1f}km, shift={shift_to_wind/1000:.1f}km")
+    ring_x, ring_y = _ellipse_ring(a, b, dx, dy)
+    ring_x.flags.writeable = False
+    ring_y.flags.writeable = False
     
-    ellipse_points = []
-    for i in range(ELLIPSE_NUM_POINTS):
-        t = 2 * math.pi * i / ELLIPSE_NUM_POINTS
-        
-        # Ellipse in local coordinates (major axis along X)
-        x_local = a * math.cos(t)
-        y_local = b * math.sin(t)
-        
-        # Rotation: Major axis should point in wind direction (dx, dy)
-        # Rotation matrix transforms (1,0) to (dx, dy):
-        # [dx  -dy]   
-        # [dy   dx]   
-        x_rot = x_local * dx - y_local * dy
-        y_rot = x_local * dy + y_local * dx
-        
-        # Add to ellipse center
-        x_final = ellipse_center_x + x_rot
-        y_final = ellipse_center_y + y_rot
+    return a, b, dx, dy, shift_to_wind * dx, shift_to_wind * dy, ring_x, ring_y
+
+
+def _ellipse_ring(a: float, b: float, dx: float, dy: float) -> tuple:
+    """
+    Ellipse vertices relative to the ellipse center.
+    
+    Returns:
+        Tuple (x, y) of ELLIPSE_NUM_POINTS-long arrays
+    """
+    t = np.linspace(0, 2 * np.pi, ELLIPSE_NUM_POINTS, endpoint=False)
+    
+    # Ellipse in local coordinates (major axis along X)
+    x_local = a * np.cos(t)
+    y_local = b * np.sin(t)
+    
+    # Rotation: Major axis should point in wind direction (dx, dy)
+    # Rotation matrix transforms (1,0) to (dx, dy):
+    # [dx  -dy]   
+    # [dy   dx]   
+    return x_local * dx - y_local * dy, x_local * dy + y_local * dx
+
+
+def intersection_areas(counties: dict, idx: np.ndarray, shape: Polygon) -> np.ndarray:
+    """
+    Area of each county's intersection with a convex shape, computed in parallel.
+    
+    The counties are clipped by a compiled kernel working on the ragged
+    polygon buffers of the county cache; it releases the GIL, so chunks of
+    counties run on separate threads.
+    
+    Args:
+        counties: County cache from build_county_cache
+        idx: Indices of the counties to intersect
+        shape: Convex projected polygon (fire ellipse or circle)
         
-        ellipse_points.append((x_final, y_final))
+    Returns:
+        Float array of intersection areas (same order as idx)
+    """
+    ring = shape.exterior if shape.exterior.is_ccw else shape.exterior.reverse()
+    clip = np.asarray(ring.coords)[:-1]
+    clip_x = np.ascontiguousarray(clip[:, 0])
+    clip_y = np.ascontiguousarray(clip[:, 1])
+    
+    def clip_chunk(chunk):
+        return clipped_polygon_areas(
+            counties["xs"], counties["ys"], counties["ring_offsets"],
+            counties["part_offsets"], counties["geom_offsets"], chunk, clip_x, clip_y
+        )
     
-    return Polygon(ellipse_points)
+    idx = np.asarray(idx, dtype=np.int64)
+    chunks = np.array_split(idx, max(1, min(INTERSECTION_WORKERS, len(idx))))
+    if len(chunks) == 1:
+        return clip_chunk(idx)
+    return np.concatenate(list(_intersection_pool.map(clip_chunk, chunks)))
 
 
 # ---------------------------------------------------------
@@ -262,7 +485,11 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
     - Curly, distorted edges
     """
     safe_map_id = map_id.replace("'", "\\'").replace('"', '\\"')
-    ellipse_json = json.dumps(ellipse_coords)
+    # Little-endian float32 pairs, base64 encoded: a third of the JSON size and
+    # no number parsing in the browser (float32 is ~1 m at these latitudes)
+    ellipse_b64 = base64.b64encode(
+        np.asarray(ellipse_coords, dtype="<f4").tobytes()
+    ).decode("ascii")
     
     return f"""
     <style>
@@ -343,6 +570,11 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
         var fireProgress = 0;
         var isFireRunning = false;
         var fireLayers = [];
+        var outerGlow = null;
+        var mainFire = null;
+        var fireRenderer = null;
+        var lastDrawElapsed = -Infinity;
+        var MIN_FRAME_MS = 1000 / 60;
         var noiseSeeds = [];
         var holeSectors = [];
         var fingerAngles = [];
@@ -350,7 +582,13 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
         var ANIMATION_DURATION = {animation_duration_sec * 1000};
         var CENTER_LAT = {center_lat};
         var CENTER_LON = {center_lon};
-        var FINAL_ELLIPSE = {ellipse_json};
+        var FINAL_ELLIPSE = (function(b64) {{
+            var bytes = Uint8Array.from(atob(b64), function(c) {{ return c.charCodeAt(0); }});
+            var flat = new Float32Array(bytes.buffer);
+            var pairs = [];
+            for (var i = 0; i < flat.length; i += 2) pairs.push([flat[i], flat[i + 1]]);
+            return pairs;
+        }})("{ellipse_b64}");
         var WIND_DIR = {wind_direction_deg};
         
         // Simplex Noise Implementation (vereinfacht)
@@ -379,9 +617,10 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
         
         function dot2(g, x, y) {{ return g[0]*x + g[1]*y; }}
         
+        var F2 = 0.5 * (Math.sqrt(3) - 1);
+        var G2 = (3 - Math.sqrt(3)) / 6;
+        
         function noise2D(x, y) {{
-            var F2 = 0.5 * (Math.sqrt(3) - 1);
-            var G2 = (3 - Math.sqrt(3)) / 6;
             var s = (x + y) * F2;
             var i = Math.floor(x + s);
             var j = Math.floor(y + s);
@@ -397,11 +636,14 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             var gi1 = gradP[i + i1 + perm[j + j1]];
             var gi2 = gradP[i + 1 + perm[j + 1]];
             var t0 = 0.5 - x0*x0 - y0*y0;
-            var n0 = t0 < 0 ? 0 : Math.pow(t0, 4) * dot2(gi0, x0, y0);
+            var n0 = 0;
+            if (t0 >= 0) {{ t0 *= t0; n0 = t0 * t0 * dot2(gi0, x0, y0); }}
             var t1 = 0.5 - x1*x1 - y1*y1;
-            var n1 = t1 < 0 ? 0 : Math.pow(t1, 4) * dot2(gi1, x1, y1);
+            var n1 = 0;
+            if (t1 >= 0) {{ t1 *= t1; n1 = t1 * t1 * dot2(gi1, x1, y1); }}
             var t2 = 0.5 - x2*x2 - y2*y2;
-            var n2 = t2 < 0 ? 0 : Math.pow(t2, 4) * dot2(gi2, x2, y2);
+            var n2 = 0;
+            if (t2 >= 0) {{ t2 *= t2; n2 = t2 * t2 * dot2(gi2, x2, y2); }}
             return 70 * (n0 + n1 + n2);
         }}
         
@@ -421,6 +663,7 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             // Random seed for this animation
             var seed = Math.floor(Math.random() * 1000000);
             initNoise(seed);
+            buildNoiseTracks();
             
             // Generate small indentations (3-5 pieces)
             holeSectors = [];
@@ -462,6 +705,10 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
                 return;
             }}
             
+            // The fire polygons change every frame: redrawing one canvas is
+            // much cheaper than updating SVG paths
+            fireRenderer = L.canvas({{ padding: 0.5 }});
+            
             document.getElementById('startFireBtn').addEventListener('click', function() {{
                 if (!isFireRunning) startFire(map);
             }});
@@ -473,7 +720,18 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             console.log('Realistic fire animation initialized!');
         }}
         
+        function clearFireLayers(map) {{
+            fireLayers.forEach(function(layer) {{
+                if (layer) map.removeLayer(layer);
+            }});
+            fireLayers = [];
+            outerGlow = null;
+            mainFire = null;
+            lastDrawElapsed = -Infinity;
+        }}
+        
         function startFire(map) {{
+            clearFireLayers(map);
             isFireRunning = true;
             fireStartTime = Date.now();
             fireProgress = 0;
@@ -495,10 +753,7 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
                 fireAnimationId = null;
             }}
             
-            fireLayers.forEach(function(layer) {{
-                if (layer) map.removeLayer(layer);
-            }});
-            fireLayers = [];
+            clearFireLayers(map);
             
             document.getElementById('startFireBtn').textContent = 'Start Simulation';
             document.getElementById('startFireBtn').disabled = false;
@@ -507,14 +762,69 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             document.getElementById('fireStatus').textContent = 'Ready';
         }}
         
+        // Points for edges, with everything per point that stays the same
+        // from frame to frame computed once
+        var NUM_SHAPE_POINTS = 80;
+        var TWO_PI = Math.PI * 2;
+        var shapeAngle = new Float64Array(NUM_SHAPE_POINTS);
+        var shapeCos = new Float64Array(NUM_SHAPE_POINTS);
+        var shapeSin = new Float64Array(NUM_SHAPE_POINTS);
+        var shapeDx = new Float64Array(NUM_SHAPE_POINTS);
+        var shapeDy = new Float64Array(NUM_SHAPE_POINTS);
+        var shapeWindFactor = new Float64Array(NUM_SHAPE_POINTS);
+        (function() {{
+            var windToRad = (WIND_DIR + 180) * Math.PI / 180;
+            for (var i = 0; i < NUM_SHAPE_POINTS; i++) {{
+                var angle = (i / NUM_SHAPE_POINTS) * TWO_PI;
+                shapeAngle[i] = angle;
+                shapeCos[i] = Math.cos(angle);
+                shapeSin[i] = Math.sin(angle);
+                
+                // Find corresponding point in final ellipse
+                var ellipseIdx = Math.floor((i / NUM_SHAPE_POINTS) * FINAL_ELLIPSE.length);
+                var finalPoint = FINAL_ELLIPSE[ellipseIdx % FINAL_ELLIPSE.length];
+                shapeDx[i] = finalPoint[1] - CENTER_LON;
+                shapeDy[i] = finalPoint[0] - CENTER_LAT;
+                
+                // Wind asymmetry (faster in wind direction) - always active
+                shapeWindFactor[i] = 0.5 + 0.5 * (0.5 + 0.5 * Math.cos(angle - windToRad));
+            }}
+        }})();
+        
+        // The edge noise of a point only changes with time, so it is sampled
+        // per point once per animation and interpolated in every frame instead
+        // of evaluating the simplex noise per point and frame
+        var NOISE_SAMPLES_PER_SEC = 20;
+        var edgeNoiseTrack = [], microNoiseTrack = [];
+        
+        function buildNoiseTracks() {{
+            var noiseScale = 1.5;
+            var samples = Math.ceil(ANIMATION_DURATION / 1000 * NOISE_SAMPLES_PER_SEC) + 2;
+            edgeNoiseTrack = [];
+            microNoiseTrack = [];
+            for (var i = 0; i < NUM_SHAPE_POINTS; i++) {{
+                var edge = new Float64Array(samples);
+                var micro = new Float64Array(samples);
+                for (var k = 0; k < samples; k++) {{
+                    var time = k / NOISE_SAMPLES_PER_SEC;
+                    var noiseX = shapeCos[i] * noiseScale + time * 0.1;
+                    var noiseY = shapeSin[i] * noiseScale + time * 0.08;
+                    edge[k] = fbm(noiseX, noiseY, 2, 0.5);
+                    micro[k] = noise2D(shapeAngle[i] * 6, time * 0.3);
+                }}
+                edgeNoiseTrack.push(edge);
+                microNoiseTrack.push(micro);
+            }}
+        }}
+        
+        function sampleTrack(track, time) {{
+            var pos = Math.min(time * NOISE_SAMPLES_PER_SEC, track.length - 1.000001);
+            var k = Math.floor(pos);
+            return track[k] + (track[k + 1] - track[k]) * (pos - k);
+        }}
+        
         function getRealisticFireShape(progress, time) {{
             var coords = [];
-            var windToRad = (WIND_DIR + 180) * Math.PI / 180;
-            var windDx = Math.sin(windToRad);
-            var windDy = Math.cos(windToRad);
-            
-            // Points for edges
-            var numPoints = 80;
             
             // === SMOOTHING FACTOR ===
             // At start (progress=0): full effects
@@ -523,28 +833,17 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             var chaosAmount = progress < 0.7 ? 1.0 : Math.max(0, (1 - progress) / 0.3);
             chaosAmount = Math.pow(chaosAmount, 1.5);  // Smoother transition
             
-            for (var i = 0; i < numPoints; i++) {{
-                var angle = (i / numPoints) * Math.PI * 2;
-                
-                // Find corresponding point in final ellipse
-                var ellipseIdx = Math.floor((i / numPoints) * FINAL_ELLIPSE.length);
-                var finalPoint = FINAL_ELLIPSE[ellipseIdx % FINAL_ELLIPSE.length];
-                var dx = finalPoint[1] - CENTER_LON;
-                var dy = finalPoint[0] - CENTER_LAT;
-                
-                // Wind asymmetry (faster in wind direction) - always active
-                var angleDiff = angle - windToRad;
-                var windFactor = 0.5 + 0.5 * (0.5 + 0.5 * Math.cos(angleDiff));
-                
-                // Base progress
-                var easedProgress = 1 - Math.pow(1 - progress, 2);
-                var localProgress = easedProgress * windFactor;
+            // Base progress
+            var easedProgress = 1 - (1 - progress) * (1 - progress);
+            
+            for (var i = 0; i < NUM_SHAPE_POINTS; i++) {{
+                var angle = shapeAngle[i];
+                var dx = shapeDx[i];
+                var dy = shapeDy[i];
+                var localProgress = easedProgress * shapeWindFactor[i];
                 
                 // === SOFT WAVES - CLOSE TO ELLIPSE ===
-                var noiseScale = 1.5;
-                var noiseX = Math.cos(angle) * noiseScale + time * 0.1;
-                var noiseY = Math.sin(angle) * noiseScale + time * 0.08;
-                var edgeNoise = fbm(noiseX, noiseY, 2, 0.5);
+                var edgeNoise = sampleTrack(edgeNoiseTrack[i], time);
                 // Very small amplitude - stays close to ellipse
                 var noiseEffect = edgeNoise * 0.06 * chaosAmount;
                 localProgress *= (0.98 + noiseEffect);
@@ -554,11 +853,11 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
                     for (var h = 0; h < holeSectors.length; h++) {{
                         var hole = holeSectors[h];
                         var holeAngleDiff = Math.abs(angle - hole.angle);
-                        if (holeAngleDiff > Math.PI) holeAngleDiff = Math.PI * 2 - holeAngleDiff;
+                        if (holeAngleDiff > Math.PI) holeAngleDiff = TWO_PI - holeAngleDiff;
                         
                         if (holeAngleDiff < hole.width && progress > hole.startProgress) {{
                             var holeStrength = 1 - (holeAngleDiff / hole.width);
-                            holeStrength = Math.pow(holeStrength, 2);
+                            holeStrength = holeStrength * holeStrength;
                             var holeFill = Math.min(1, (progress - hole.startProgress) * hole.fillRate * 2);
                             // Very shallow dents - max 8% depth
                             var holeDepth = hole.depth * 0.2 * (1 - holeFill) * holeStrength * chaosAmount;
@@ -572,11 +871,11 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
                     for (var f = 0; f < fingerAngles.length; f++) {{
                         var finger = fingerAngles[f];
                         var fingerAngleDiff = Math.abs(angle - finger.angle);
-                        if (fingerAngleDiff > Math.PI) fingerAngleDiff = Math.PI * 2 - fingerAngleDiff;
+                        if (fingerAngleDiff > Math.PI) fingerAngleDiff = TWO_PI - fingerAngleDiff;
                         
                         if (fingerAngleDiff < finger.width) {{
                             var fingerStrength = 1 - (fingerAngleDiff / finger.width);
-                            fingerStrength = Math.pow(fingerStrength, 2);
+                            fingerStrength = fingerStrength * fingerStrength;
                             var fingerProgress = Math.min(progress * finger.speed, 1);
                             // Very short protrusions - max 5% beyond ellipse
                             var fingerEffect = finger.length * 0.25 * fingerStrength * fingerProgress * chaosAmount;
@@ -586,7 +885,7 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
                 }}
                 
                 // === Micro-Variation (kaum sichtbar) ===
-                var microNoise = noise2D(angle * 6, time * 0.3);
+                var microNoise = sampleTrack(microNoiseTrack[i], time);
                 var microEffect = microNoise * 0.015 * chaosAmount;
                 localProgress *= (1 + microEffect);
                 
@@ -646,44 +945,58 @@ def generate_fire_animation_script(map_id: str, center_lat: float, center_lon: f
             var percent = Math.floor(fireProgress * 100);
             document.getElementById('fireStatus').textContent = 'Progress: ' + percent + '%';
             
-            // Remove old fire layers
-            fireLayers.forEach(function(layer) {{
-                if (layer) map.removeLayer(layer);
-            }});
-            fireLayers = [];
-            
-            // Calculate realistic fire shape
-            var currentCoords = getRealisticFireShape(fireProgress, time);
-            
-            // === MULTIPLE LAYERS for more realistic look ===
-            
-            // Äußerer Glühring (schwach)
-            if (fireProgress > 0.1) {{
-                var outerGlow = L.polygon(currentCoords, {{
-                    color: 'rgba(255, 100, 0, 0.3)',
-                    fillColor: 'rgba(255, 150, 50, 0.1)',
-                    fillOpacity: 0.1,
-                    weight: 8,
+            // The fire layers are created once and then only get new
+            // coordinates; faster displays are capped at 60 shape updates/s
+            if (fireProgress >= 1 || elapsed - lastDrawElapsed >= MIN_FRAME_MS) {{
+                lastDrawElapsed = elapsed;
+                
+                // Calculate realistic fire shape
+                var currentCoords = getRealisticFireShape(fireProgress, time);
+                
+                // === MULTIPLE LAYERS for more realistic look ===
+                
+                // Äußerer Glühring (schwach)
+                if (fireProgress > 0.1) {{
+                    if (outerGlow) {{
+                        outerGlow.setLatLngs(currentCoords);
+                    }} else {{
+                        outerGlow = L.polygon(currentCoords, {{
+                            color: 'rgba(255, 100, 0, 0.3)',
+                            fillColor: 'rgba(255, 150, 50, 0.1)',
+                            fillOpacity: 0.1,
+                            weight: 8,
+                            lineCap: 'round',
+                            lineJoin: 'round',
+                            renderer: fireRenderer
+                        }}).addTo(map);
+                        fireLayers.push(outerGlow);
+                        // The glow appears later but stays below the main fire
+                        if (mainFire) mainFire.bringToFront();
+                    }}
+                }}
+                
+                // Hauptfeuer (rot-orange, ohne gelben Kern)
+                var mainR = 255;
+                var mainG = Math.floor(60 + fireProgress * 70);
+                var mainB = 0;
+                var mainStyle = {{
+                    color: 'rgb(' + mainR + ',' + Math.floor(mainG * 0.5) + ',0)',
+                    fillColor: 'rgb(' + mainR + ',' + mainG + ',' + mainB + ')',
+                    fillOpacity: 0.4 + fireProgress * 0.1,
+                    weight: 3,
                     lineCap: 'round',
-                    lineJoin: 'round'
-                }}).addTo(map);
-                fireLayers.push(outerGlow);
+                    lineJoin: 'round',
+                    renderer: fireRenderer
+                }};
+                if (mainFire) {{
+                    mainFire.setLatLngs(currentCoords);
+                    mainFire.setStyle(mainStyle);
+                }} else {{
+                    mainFire = L.polygon(currentCoords, mainStyle).addTo(map);
+                    fireLayers.push(mainFire);
+                }}
             }}
             
-            // Hauptfeuer (rot-orange, ohne gelben Kern)
-            var mainR = 255;
-            var mainG = Math.floor(60 + fireProgress * 70);
-            var mainB = 0;
-            var mainFire = L.polygon(currentCoords, {{
-                color: 'rgb(' + mainR + ',' + Math.floor(mainG * 0.5) + ',0)',
-                fillColor: 'rgb(' + mainR + ',' + mainG + ',' + mainB + ')',
-                fillOpacity: 0.4 + fireProgress * 0.1,
-                weight: 3,
-                lineCap: 'round',
-                lineJoin: 'round'
-            }}).addTo(map);
-            fireLayers.push(mainFire);
-            
             // Animation fortsetzen oder beenden
             if (fireProgress < 1) {{
                 fireAnimationId = requestAnimationFrame(function() {{
@@ -729,8 +1042,9 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
     
     Args:
         map_id: Leaflet map ID
-        u_json: JSON string of U components
-        v_json: JSON string of V components
+        u_json: JSON string of U components (grid, quantized grid as written by
+            _grid_json, or one number for a uniform field)
+        v_json: JSON string of V components (same forms as u_json)
         lat_json: JSON string of latitudes
         lon_json: JSON string of longitudes
         wind_direction_deg: Wind direction in degrees
@@ -741,6 +1055,10 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
     # Escape map_id for JavaScript safety
     safe_map_id = map_id.replace("'", "\\'").replace('"', '\\"')
     
+    # Canvas rotation of the arrows: they point where the wind blows TO
+    # (wind_direction_deg + 180), measured clockwise from north
+    arrow_angle = math.radians((wind_direction_deg + 180) % 360 - 90)
+    
     return f"""
     <style>
         #windCanvas {{
@@ -757,6 +1075,9 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
     <script>
     (function() {{
         var animationId = null;
+        var lastFrameTime = 0;
+        var WIND_FRAME_MS = 1000 / {WIND_MAX_FPS};
+        var BASE_FRAME_MS = 1000 / 60;  // Particle speed and aging are per 60 fps frame
         
         function initWindAnimation() {{
             if (typeof L === 'undefined') {{
@@ -777,19 +1098,52 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
             }}
             
             var ctx = canvas.getContext('2d');
-            var particles = [];
+            var ARROW_ANGLE = {arrow_angle!r};
+            
+            // Particle state as parallel typed arrays, one slot per particle
+            var particleLat = new Float64Array({PARTICLE_COUNT});
+            var particleLon = new Float64Array({PARTICLE_COUNT});
+            var particleAge = new Float32Array({PARTICLE_COUNT});
             
             // Wind-Daten
-            var u = {u_json};
-            var v = {v_json};
             var latGrid = {lat_json};
             var lonGrid = {lon_json};
+            // Row-major flat copy of a wind component: grid[i * lonGrid.length + j]
+            function flattenGrid(values) {{
+                var grid = new Float32Array(latGrid.length * lonGrid.length);
+                if (typeof values === 'number') return grid.fill(values);
+                if (values.levels) {{
+                    // 8-bit quantized grid, already row-major
+                    for (var k = 0; k < grid.length; k++) {{
+                        grid[k] = values.offset + values.levels[k] * values.scale;
+                    }}
+                    return grid;
+                }}
+                for (var i = 0; i < latGrid.length; i++) {{
+                    grid.set(values[i], i * lonGrid.length);
+                }}
+                return grid;
+            }}
+            var uData = {u_json};
+            var vData = {v_json};
+            // A uniform field is the same everywhere: no grid lookup needed
+            var uniformWind = (typeof uData === 'number' && typeof vData === 'number') ? {{u: uData, v: vData}} : null;
+            var u = uniformWind ? null : flattenGrid(uData);
+            var v = uniformWind ? null : flattenGrid(vData);
+            
+            // The grid is evenly spaced, so a cell is found by index math
+            var latLast = latGrid.length - 1, lonLast = lonGrid.length - 1;
+            var latStep = (latGrid[latLast] - latGrid[0]) / (latLast || 1) || 1;
+            var lonStep = (lonGrid[lonLast] - lonGrid[0]) / (lonLast || 1) || 1;
             
             // Canvas-Größe anpassen
             function resizeCanvas() {{
                 var mapElement = document.getElementById('{safe_map_id}');
                 if (mapElement) {{
                     var rect = mapElement.getBoundingClientRect();
+                    // Assigning the size clears and reallocates the canvas,
+                    // so pans and zooms that keep it leave it alone
+                    if (canvas.width === rect.width && canvas.height === rect.height) return;
                     canvas.width = rect.width;
                     canvas.height = rect.height;
                     canvas.style.width = rect.width + 'px';
@@ -810,57 +1164,49 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
                 }}
             }});
             
-            // Particle class
-            function Particle() {{
-                var bounds = map.getBounds();
-                this.lat = bounds.getSouth() + Math.random() * (bounds.getNorth() - bounds.getSouth());
-                this.lon = bounds.getWest() + Math.random() * (bounds.getEast() - bounds.getWest());
-                this.age = Math.random() * 90;
-                this.maxAge = {PARTICLE_MAX_AGE};
+            // Container pixel position of a particle. The folium map uses Leaflet's
+            // default Web Mercator CRS, so the projection is done inline: x and y
+            // are offsets from the container point of lat/lon 0, set per frame
+            var originX = 0, originY = 0, pxPerDeg = 0, pxPerRad = 0;
+            function updateProjection(zoom) {{
+                var worldSize = 256 * Math.pow(2, zoom);
+                var origin = map.latLngToContainerPoint([0, 0]);
+                originX = origin.x;
+                originY = origin.y;
+                pxPerDeg = worldSize / 360;
+                pxPerRad = worldSize / (2 * Math.PI);
+            }}
+            function containerX(lon) {{
+                return originX + lon * pxPerDeg;
+            }}
+            function containerY(lat) {{
+                return originY - Math.log(Math.tan(Math.PI / 4 + lat * Math.PI / 360)) * pxPerRad;
+            }}
+            
+            // Move particle k to a random position between sw and ne
+            function respawnParticle(k, sw, ne) {{
+                particleLat[k] = sw.lat + Math.random() * (ne.lat - sw.lat);
+                particleLon[k] = sw.lng + Math.random() * (ne.lng - sw.lng);
+                particleAge[k] = 0;
             }}
             
             // Bilinear interpolation for smoother wind data
             function getWindAt(lat, lon) {{
-                var i0 = 0, i1 = 0, j0 = 0, j1 = 0;
-                var found = false;
+                if (uniformWind) return uniformWind;
                 
-                for (var i = 0; i < latGrid.length - 1; i++) {{
-                    if (lat >= latGrid[i] && lat <= latGrid[i + 1]) {{
-                        i0 = i;
-                        i1 = i + 1;
-                        found = true;
-                        break;
-                    }}
-                }}
-                if (!found) {{
-                    i0 = lat < latGrid[0] ? 0 : latGrid.length - 1;
-                    i1 = i0;
-                }}
-                
-                found = false;
-                for (var j = 0; j < lonGrid.length - 1; j++) {{
-                    if (lon >= lonGrid[j] && lon <= lonGrid[j + 1]) {{
-                        j0 = j;
-                        j1 = j + 1;
-                        found = true;
-                        break;
-                    }}
-                }}
-                if (!found) {{
-                    j0 = lon < lonGrid[0] ? 0 : lonGrid.length - 1;
-                    j1 = j0;
-                }}
+                // Fractional grid positions, clamped to the grid edges
+                var fi = Math.min(Math.max((lat - latGrid[0]) / latStep, 0), latLast);
+                var fj = Math.min(Math.max((lon - lonGrid[0]) / lonStep, 0), lonLast);
+                var i0 = Math.min(fi | 0, Math.max(latLast - 1, 0)), i1 = Math.min(i0 + 1, latLast);
+                var j0 = Math.min(fj | 0, Math.max(lonLast - 1, 0)), j1 = Math.min(j0 + 1, lonLast);
+                var fy = fi - i0;
+                var fx = fj - j0;
                 
-                var lat0 = latGrid[i0], lat1 = latGrid[i1];
-                var lon0 = lonGrid[j0], lon1 = lonGrid[j1];
-                
-                var fx = (lon - lon0) / (lon1 - lon0 || 1);
-                var fy = (lat - lat0) / (lat1 - lat0 || 1);
-                
-                var u00 = u[i0][j0], u01 = u[i0][j1];
-                var u10 = u[i1][j0], u11 = u[i1][j1];
-                var v00 = v[i0][j0], v01 = v[i0][j1];
-                var v10 = v[i1][j0], v11 = v[i1][j1];
+                var row0 = i0 * lonGrid.length, row1 = i1 * lonGrid.length;
+                var u00 = u[row0 + j0], u01 = u[row0 + j1];
+                var u10 = u[row1 + j0], u11 = u[row1 + j1];
+                var v00 = v[row0 + j0], v01 = v[row0 + j1];
+                var v10 = v[row1 + j0], v11 = v[row1 + j1];
                 
                 var u_interp = (1 - fx) * (1 - fy) * u00 + 
                               fx * (1 - fy) * u01 + 
@@ -903,83 +1249,110 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
                 ctx.restore();
             }}
             
+            // All arrows share one rotation, so each is pre-rendered once per
+            // speed (rounded to 1 mph) and stamped onto the canvas with drawImage
+            var ARROW_SPRITE_HALF = 44;  // > longest arrow (40px) plus its outline
+            var arrowSprites = {{}};
+            function getArrowSprite(speed) {{
+                var key = Math.round(speed);
+                var sprite = arrowSprites[key];
+                if (sprite) return sprite;
+                
+                // Color: Dark blue, very transparent
+                var normalizedSpeed = Math.min(key / 50, 1);
+                // Dark blue gradient: medium blue to very dark blue
+                var r = Math.floor(20 + normalizedSpeed * 30);   // 20-50
+                var g = Math.floor(50 + normalizedSpeed * 80);  // 50-130
+                var b = Math.floor(100 + normalizedSpeed * 155); // 100-255
+                var color = r + ', ' + g + ', ' + b;
+                
+                sprite = document.createElement('canvas');
+                sprite.width = sprite.height = 2 * ARROW_SPRITE_HALF;
+                drawArrow(sprite.getContext('2d'), ARROW_SPRITE_HALF, ARROW_SPRITE_HALF,
+                          ARROW_ANGLE, key * 0.7, color, 1);
+                arrowSprites[key] = sprite;
+                return sprite;
+            }}
+            
             // Create particles (arrows)
             function createParticles() {{
                 var bounds = map.getBounds();
-                for (var i = 0; i < {PARTICLE_COUNT}; i++) {{
-                    var p = new Particle();
-                    p.lat = bounds.getSouth() + Math.random() * (bounds.getNorth() - bounds.getSouth());
-                    p.lon = bounds.getWest() + Math.random() * (bounds.getEast() - bounds.getWest());
-                    particles.push(p);
+                var sw = bounds.getSouthWest();
+                var ne = bounds.getNorthEast();
+                for (var k = 0; k < {PARTICLE_COUNT}; k++) {{
+                    respawnParticle(k, sw, ne);
+                    particleAge[k] = Math.random() * 90;
                 }}
             }}
             
             // Animation loop - smooth movement
-            function animate() {{
+            function animate(now) {{
+                animationId = requestAnimationFrame(animate);
+                
+                // Redraw at most WIND_MAX_FPS times a second (1 ms of slack for
+                // timestamp jitter) and not at all while the tab is hidden
+                if (document.hidden || now - lastFrameTime < WIND_FRAME_MS - 1) return;
+                
+                // Move particles by the time since the last drawn frame, so the
+                // lower frame rate keeps their speed; capped after long pauses
+                var steps = lastFrameTime ? Math.min((now - lastFrameTime) / BASE_FRAME_MS, 4) : 1;
+                lastFrameTime = now;
+                
                 ctx.clearRect(0, 0, canvas.width, canvas.height);
                 
                 var bounds = map.getBounds();
                 var sw = bounds.getSouthWest();
                 var ne = bounds.getNorthEast();
                 
-                particles.forEach(function(p) {{
-                    var wind = getWindAt(p.lat, p.lon);
-                    var speed = Math.sqrt(wind.u * wind.u + wind.v * wind.v);
-                    
-                    // Zoom-dependent speed
-                    var zoom = map.getZoom();
-                    var baseScale = 0.0001;
-                    var zoomFactor = Math.pow(0.7, zoom - 7);
-                    var scale = baseScale * zoomFactor;
-                    
-                    p.lat += wind.v * scale;
-                    p.lon += wind.u * scale;
-                    p.age += 0.3;
+                // Zoom-dependent speed
+                var zoom = map.getZoom();
+                var baseScale = 0.0001;
+                var zoomFactor = Math.pow(0.7, zoom - 7);
+                var scale = baseScale * zoomFactor * steps;
+                updateProjection(zoom);
+                
+                for (var k = 0; k < {PARTICLE_COUNT}; k++) {{
+                    var wind = getWindAt(particleLat[k], particleLon[k]);
                     
-                    var point = map.latLngToContainerPoint([p.lat, p.lon]);
+                    particleLat[k] += wind.v * scale;
+                    particleLon[k] += wind.u * scale;
+                    particleAge[k] += 0.3 * steps;
                     
-                    if (point.x < -100 || point.x > canvas.width + 100 || 
-                        point.y < -100 || point.y > canvas.height + 100 ||
-                        p.lat < sw.lat - 2 || p.lat > ne.lat + 2 ||
-                        p.lon < sw.lng - 2 || p.lon > ne.lng + 2) {{
-                        p.lat = sw.lat + Math.random() * (ne.lat - sw.lat);
-                        p.lon = sw.lng + Math.random() * (ne.lng - sw.lng);
-                        p.age = 0;
-                        point = map.latLngToContainerPoint([p.lat, p.lon]);
+                    // Particles far outside the view are respawned before projecting
+                    if (particleLat[k] < sw.lat - 2 || particleLat[k] > ne.lat + 2 ||
+                        particleLon[k] < sw.lng - 2 || particleLon[k] > ne.lng + 2) {{
+                        respawnParticle(k, sw, ne);
                     }}
                     
-                    // Calculate angle (arrow points IN wind direction)
-                    var windDirectionDeg = {wind_direction_deg};
-                    var arrowDirectionDeg = (windDirectionDeg + 180) % 360;
-                    var angle = ((arrowDirectionDeg - 90) * Math.PI) / 180;
+                    var x = containerX(particleLon[k]);
+                    var y = containerY(particleLat[k]);
                     
-                    // Color: Dark blue, very transparent
-                    var normalizedSpeed = Math.min(speed / 50, 1);
-                    // Dark blue gradient: medium blue to very dark blue
-                    var r = Math.floor(20 + normalizedSpeed * 30);   // 20-50
-                    var g = Math.floor(50 + normalizedSpeed * 80);  // 50-130
-                    var b = Math.floor(100 + normalizedSpeed * 155); // 100-255
-                    var color = r + ', ' + g + ', ' + b;
+                    if (x < -100 || x > canvas.width + 100 || 
+                        y < -100 || y > canvas.height + 100) {{
+                        respawnParticle(k, sw, ne);
+                        x = containerX(particleLon[k]);
+                        y = containerY(particleLat[k]);
+                    }}
                     
                     var alpha = 0.25 + (Math.random() * 0.15);  // Much more transparent
                     
-                    if (point.x >= -50 && point.x <= canvas.width + 50 &&
-                        point.y >= -50 && point.y <= canvas.height + 50) {{
-                        drawArrow(ctx, point.x, point.y, angle, speed * 0.7, color, alpha);
+                    if (x >= -50 && x <= canvas.width + 50 &&
+                        y >= -50 && y <= canvas.height + 50) {{
+                        var speed = Math.sqrt(wind.u * wind.u + wind.v * wind.v);
+                        ctx.globalAlpha = alpha;
+                        ctx.drawImage(getArrowSprite(speed), x - ARROW_SPRITE_HALF,
+                                      y - ARROW_SPRITE_HALF);
                     }}
                     
-                    if (p.age > p.maxAge) {{
-                        p.lat = sw.lat + Math.random() * (ne.lat - sw.lat);
-                        p.lon = sw.lng + Math.random() * (ne.lng - sw.lng);
-                        p.age = 0;
+                    if (particleAge[k] > {PARTICLE_MAX_AGE}) {{
+                        respawnParticle(k, sw, ne);
                     }}
-                }});
-                
-                animationId = requestAnimationFrame(animate);
+                }}
+                ctx.globalAlpha = 1;
             }}
             
             createParticles();
-            animate();
+            animationId = requestAnimationFrame(animate);
             
             console.log('Wind animation started!');
         }}
@@ -1004,14 +1377,15 @@ def generate_wind_script(map_id: str, u_json: str, v_json: str,
 # ---------------------------------------------------------
 # 7. Main function
 # ---------------------------------------------------------
-def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float, 
+def population_map(counties, lat: float, lon: float, 
                    radius_km: float, wind_speed_mph: float, 
                    wind_direction_deg: float) -> tuple:
     """
     Create a map with population data and wind animation.
     
     Args:
-        gdf: GeoDataFrame with county data
+        counties: County cache from build_county_cache (a plain GeoDataFrame
+            with county data is accepted too and converted on the fly)
         lat: Center latitude
         lon: Center longitude
         radius_km: Radius in kilometers
@@ -1019,35 +1393,56 @@ def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float,
         wind_direction_deg: Wind direction in degrees
         
     Returns:
-        Tuple (total_pop, table_sorted, map, wind_data)
+        Tuple (total_pop, table, map, wind_data); the county table is not
+        sorted, use nlargest on population_contrib for the top counties
     """
     radius_m = radius_km * 1000
 
-    # Project for precise area calculation
-    gdf_proj = gdf.to_crs(CRS_ALBERS)
-    
-    # ELLIPSE instead of circle (based on wind)
-    ellipse_proj_geom = create_wind_ellipse(lat, lon, radius_km, wind_speed_mph, wind_direction_deg)
+    if isinstance(counties, gpd.GeoDataFrame):
+        counties = build_county_cache(counties)
+
+    # ELLIPSE instead of circle (based on wind), translated from the cached shape
+    ellipse = wind_ellipse_params(lat, lon, radius_km, wind_speed_mph, wind_direction_deg)
+    *_, ring_x, ring_y = _wind_structs(radius_km, wind_speed_mph, wind_direction_deg)
+    ellipse_proj_geom = shapely.polygons(np.column_stack((ellipse[0] + ring_x, ellipse[1] + ring_y)))
 
-    # Intersect counties with ELLIPSE (not circle!)
-    intersects = gdf_proj[gdf_proj.intersects(ellipse_proj_geom)].copy()
+    # Intersect counties with ELLIPSE (not circle!); the tree narrows the exact
+    # test down to counties whose bounding box overlaps the ellipse
+    hit = np.sort(counties["tree"].query(ellipse_proj_geom, predicate="intersects"))
+    # Rows in WGS84 for display
+    intersects = counties["gdf"].iloc[hit].copy()
     
     # Check if counties found
     if intersects.empty:
         print("Warning: No counties found in area.")
         total_pop = 0
-        table_sorted = intersects.to_crs(CRS_WGS84)
+        table = intersects
     else:
-        intersects["intersection_area"] = intersects.intersection(ellipse_proj_geom).area
-        intersects["county_area"] = intersects.geometry.area
+        # Counties whose bounding box lies inside the ellipse are covered completely
+        # and skip the polygon intersection. The polygon is inscribed in the true
+        # ellipse, so corners are tested against the largest ellipse it contains.
+        center_x, center_y, a, b, dx, dy = ellipse
+        shrink = math.cos(math.pi / ELLIPSE_NUM_POINTS)
+        minx, miny = counties["minx"][hit], counties["miny"][hit]
+        maxx, maxy = counties["maxx"][hit], counties["maxy"][hit]
+        covered = points_in_ellipse(
+            np.concatenate((minx, minx, maxx, maxx)),
+            np.concatenate((miny, maxy, miny, maxy)),
+            center_x, center_y, a * shrink, b * shrink, math.atan2(dy, dx)
+        ).reshape(4, -1).all(axis=0)
+        
+        county_area = counties["area"][hit]
+        intersection_area = county_area.copy()
+        partial = ~covered
+        intersection_area[partial] = intersection_areas(counties, hit[partial], ellipse_proj_geom)
+        intersects["intersection_area"] = intersection_area
+        intersects["county_area"] = county_area
         
         # Prevent division by zero
-        intersects["fraction"] = intersects.apply(
-            lambda row: row["intersection_area"] / row["county_area"] 
-            if row["county_area"] > 0 else 0, 
-            axis=1
-        )
-        intersects["population_contrib"] = intersects["population"] * intersects["fraction"]
+        fraction = np.divide(intersection_area, county_area,
+                             out=np.zeros_like(county_area), where=county_area > 0)
+        intersects["fraction"] = fraction
+        intersects["population_contrib"] = intersects["population"].to_numpy() * fraction
 
         total_pop = intersects["population_contrib"].sum()
 
@@ -1055,8 +1450,7 @@ def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float,
         # fraction is already between 0 and 1, use directly as heat
         intersects["heat"] = intersects["fraction"].clip(0, 1)
 
-        intersects = intersects.to_crs(CRS_WGS84)
-        table_sorted = intersects.sort_values("population_contrib", ascending=False)
+        table = intersects
 
     # -------- MAP --------
     m = folium.Map(location=[lat, lon], zoom_start=7, tiles="CartoDB positron")
@@ -1068,14 +1462,10 @@ def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float,
     m.get_root().script.add_child(folium.Element(f"window.map = {map_id};"))
     
     # Prepare ellipse for animation (in WGS84)
-    ellipse_wgs84 = gpd.GeoDataFrame([1], geometry=[ellipse_proj_geom], crs=CRS_ALBERS)
-    ellipse_wgs84 = ellipse_wgs84.to_crs(CRS_WGS84)
-    ellipse_geom_wgs84 = ellipse_wgs84.geometry.iloc[0]
+    ellipse_lon, ellipse_lat = TO_WGS84.transform(*ellipse_proj_geom.exterior.xy)
     
-    # Extract ellipse coordinates for animation
-    ellipse_coords = list(ellipse_geom_wgs84.exterior.coords)
     # Format: [[lat, lon], [lat, lon], ...] for Leaflet
-    ellipse_coords_latlon = [[coord[1], coord[0]] for coord in ellipse_coords]
+    ellipse_coords_latlon = np.column_stack((ellipse_lat, ellipse_lon)).tolist()
     
     # Fire origin marker with fire icon
     folium.Marker(
@@ -1084,24 +1474,41 @@ def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float,
         icon=folium.Icon(color='red', icon='fire', prefix='fa')
     ).add_to(m)
 
-    # Draw counties (only if present)
-    if not table_sorted.empty:
-        for _, row in table_sorted.iterrows():
-            folium.GeoJson(
-                row.geometry.__geo_interface__,
-                style_function=lambda x, fc=color_from_heat(row["heat"]): {
-                    "fillColor": fc,
-                    "color": "black",
-                    "weight": 1,
-                    "fillOpacity": 0.55,
+    # Draw counties (only if present), all in one GeoJSON layer
+    if not table.empty:
+        geometries = shapely.transform(table.geometry.to_numpy(), lambda c: c.round(COORD_DECIMALS))
+        # The feature id keys folium's per-feature style lookup
+        features = [
+            {
+                "type": "Feature",
+                "id": i,
+                "geometry": geometry.__geo_interface__,
+                "properties": {
+                    "fillColor": fill_color,
+                    "tooltip": (
+                        f"{county}, {state}<br>"
+                        f"Population: {int(population):,}<br>"
+                        f"Affected share: {fraction:.2%}<br>"
+                        f"Contributing pop: {int(contrib):,}"
+                    ),
                 },
-                tooltip=folium.Tooltip(
-                    f"{row['COUNTY']}, {row['STATE']}<br>"
-                    f"Population: {int(row['population']):,}<br>"
-                    f"Affected share: {row['fraction']:.2%}<br>"
-                    f"Contributing pop: {int(row['population_contrib']):,}"
-                ),
-            ).add_to(m)
+            }
+            for i, (geometry, county, state, population, fraction, contrib, fill_color) in enumerate(zip(
+                geometries, table["COUNTY"], table["STATE"], table["population"],
+                table["fraction"], table["population_contrib"],
+                colors_from_heat(table["heat"].to_numpy()).tolist()
+            ))
+        ]
+        folium.GeoJson(
+            {"type": "FeatureCollection", "features": features},
+            style_function=lambda feature: {
+                "fillColor": feature["properties"]["fillColor"],
+                "color": "black",
+                "weight": 1,
+                "fillOpacity": 0.55,
+            },
+            tooltip=folium.GeoJsonTooltip(fields=["tooltip"], labels=False),
+        ).add_to(m)
 
     # ---------- WIND DATA ----------
     # Generate wind field for canvas animation
@@ -1124,7 +1531,7 @@ def population_map(gdf: gpd.GeoDataFrame, lat: float, lon: float,
         'ellipse_coords': ellipse_coords_latlon
     }
 
-    return total_pop, table_sorted, m, wind_data
+    return total_pop, table, m, wind_data
 
 
 def save_map_with_wind(m: folium.Map, wind_data: dict, output_file: str):
@@ -1136,14 +1543,11 @@ def save_map_with_wind(m: folium.Map, wind_data: dict, output_file: str):
         wind_data: Dictionary with wind and fire data
         output_file: Output filename
     """
-    # Save map
-    m.save(output_file)
-    
     # Convert wind data to JSON
-    u_json = json.dumps(wind_data['u'])
-    v_json = json.dumps(wind_data['v'])
-    lat_json = json.dumps(wind_data['lat_grid'])
-    lon_json = json.dumps(wind_data['lon_grid'])
+    u_json = _grid_json(wind_data['u'])
+    v_json = _grid_json(wind_data['v'])
+    lat_json = json.dumps(np.round(wind_data['lat_grid'], COORD_DECIMALS).tolist())
+    lon_json = json.dumps(np.round(wind_data['lon_grid'], COORD_DECIMALS).tolist())
     
     # Generate wind script
     wind_script = generate_wind_script(
@@ -1162,26 +1566,91 @@ def save_map_with_wind(m: folium.Map, wind_data: dict, output_file: str):
         animation_duration_sec=12.0  # 12 seconds animation
     )
     
-    # Insert scripts into HTML file
-    try:
-        with open(output_file, "r", encoding="utf-8") as f:
-            html_content = f.read()
-        
-        if "</body>" in html_content:
-            # Insert both animations
-            all_scripts = fire_script + "\n" + wind_script
-            html_content = html_content.replace("</body>", all_scripts + "\n</body>")
-            with open(output_file, "w", encoding="utf-8") as f:
-                f.write(html_content)
-        else:
-            print(f"Warning: </body> tag not found in {output_file}")
-            
-    except IOError as e:
-        print(f"Error writing file: {e}")
+    # Render the map and insert both animations before </body>, so the
+    # file is written once instead of saved, read back and rewritten
+    html_content = m.get_root().render()
+    body_end = html_content.rfind("</body>")
+    if body_end != -1:
+        all_scripts = fire_script + "\n" + wind_script
+        html_content = html_content[:body_end] + all_scripts + "\n" + html_content[body_end:]
+    else:
+        print(f"Warning: </body> tag not found in {output_file}")
+    
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(html_content)
+
+
+def _grid_json(grid) -> str:
+    """
+    JSON for a wind component grid.
+    
+    A uniform grid becomes its single value. Any other grid is quantized to
+    256 levels between its minimum and maximum and sent as
+    {"offset", "scale", "levels"}, the levels in row-major order.
+    """
+    grid = np.asarray(grid, dtype=float)
+    if not grid.size:
+        return json.dumps(grid.tolist())
+    if (grid == grid.flat[0]).all():
+        return json.dumps(float(grid.flat[0]))
+    offset = float(grid.min())
+    scale = (float(grid.max()) - offset) / 255
+    levels = np.round((grid - offset) / scale).astype(np.uint8)
+    return json.dumps({"offset": offset, "scale": scale, "levels": levels.ravel().tolist()})
 
 
 # ---------------------------------------------------------
-# 8. Example / Main
+# 8. Process pool entry points
+# ---------------------------------------------------------
+_worker_counties = None  # County cache of this worker process
+
+
+def load_worker_counties(counties_file: str, population_file: str):
+    """
+    Load and prepare the counties once per process.
+    
+    Called by render_map_file, and submitted once per worker at backend
+    startup so the first map request does not pay for it.
+    """
+    global _worker_counties
+    if _worker_counties is None:
+        _worker_counties = build_county_cache(
+            load_county_data(counties_file, population_file), counties_file
+        )
+
+
+def render_map_file(counties_file: str, population_file: str, lat: float, lon: float,
+                    radius_km: float, wind_speed_mph: float, wind_direction_deg: float,
+                    output_file: str, top_n: int = 15) -> tuple:
+    """
+    Run population_map and save_map_with_wind in a worker process.
+    
+    A gzip-compressed copy of the HTML is written to output_file + ".gz" for
+    clients accepting gzip. Only picklable summaries travel back to the
+    caller: the folium map stays in the worker and the county table is cut
+    down to the top_n rows.
+    
+    Returns:
+        Tuple (total_pop, top) with top the top_n rows of the county table
+        (COUNTY, STATE, population, fraction, population_contrib)
+    """
+    load_worker_counties(counties_file, population_file)
+    total_pop, table, m, wind_data = population_map(
+        _worker_counties, lat, lon, radius_km, wind_speed_mph, wind_direction_deg
+    )
+    save_map_with_wind(m, wind_data, output_file)
+    with open(output_file, "rb") as f_in, gzip.open(output_file + ".gz", "wb", compresslevel=6) as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    
+    columns = ["COUNTY", "STATE", "population", "fraction", "population_contrib"]
+    if table.empty:
+        # No county hit (ocean, outside the US): the table lacks the columns
+        return float(total_pop), pd.DataFrame(columns=columns)
+    return float(total_pop), pd.DataFrame(table.nlargest(top_n, "population_contrib")[columns])
+
+
+# ---------------------------------------------------------
+# 9. Example / Main
 # ---------------------------------------------------------
 if __name__ == "__main__":
     # Parameters
@@ -1196,6 +1665,7 @@ if __name__ == "__main__":
     angle = 90 - fire_spread
     print(f"Wind from: {wind_direction_deg}° → Fire to: {fire_spread}°")
     print(f"Mathematical angle: {angle}° (cos={math.cos(math.radians(angle)):.2f}, sin={math.sin(math.radians(angle)):.2f})")
+    wind_ellipse_params(lat, lon, radius_km, wind_speed_mph, wind_direction_deg, verbose=True)
 
     try:
         # Load data
@@ -1211,13 +1681,24 @@ if __name__ == "__main__":
         
         print(f"Population inside {radius_km} km: {total_pop:,.0f}")
         if not table.empty:
-            print(table[['COUNTY', 'STATE', 'population', 'fraction', 'population_contrib']].head())
+            print(table.nlargest(5, 'population_contrib')[['COUNTY', 'STATE', 'population', 'fraction', 'population_contrib']])
         
         # Save map with wind
         print(f"Saving map to {OUTPUT_FILE}...")
         save_map_with_wind(m, wind_data, OUTPUT_FILE)
         print(f"Saved: {OUTPUT_FILE}")
         
+        # Regression check: a fire off the coast hits no county and must
+        # yield an empty top table instead of failing
+        offshore_file = OUTPUT_FILE.replace(".html", "_offshore.html")
+        offshore_pop, offshore_top = render_map_file(
+            COUNTIES_FILE, POPULATION_FILE, 25.0, -120.0, 30, 10, 90, offshore_file
+        )
+        assert offshore_pop == 0 and offshore_top.empty, "offshore fire hit counties"
+        os.remove(offshore_file)
+        os.remove(offshore_file + ".gz")
+        print("Offshore check: no counties, empty table")
+        
     except FileNotFoundError as e:
         print(f"Error: {e}")
         sys.exit(1)